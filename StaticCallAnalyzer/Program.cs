@@ -28,8 +28,7 @@ class Program
 
             var staticCalls = root.DescendantNodes()
                 .OfType<MemberAccessExpressionSyntax>()
-                .Where(m => StaticCallConfig.Patterns.Any(p =>
-                    m.Expression.ToString() == p.ClassName && m.Name.ToString() == p.MethodName))
+                .Where(m => StaticCallConfig.IsTracked(m.Expression.ToString(), m.Name.ToString()))
                 .ToList();
 
             if (staticCalls.Count == 0) continue;
@@ -54,8 +53,7 @@ class Program
                     // Find static calls within this specific method, not the entire class
                     var methodStaticCalls = method.DescendantNodes()
                         .OfType<MemberAccessExpressionSyntax>()
-                        .Where(m => StaticCallConfig.Patterns.Any(p =>
-                            m.Expression.ToString() == p.ClassName && m.Name.ToString() == p.MethodName))
+                        .Where(m => StaticCallConfig.IsTracked(m.Expression.ToString(), m.Name.ToString()))
                         .ToList();
 
                     if (methodStaticCalls.Any())
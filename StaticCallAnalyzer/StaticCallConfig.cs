@@ -1,6 +1,12 @@
+using System.Text.Json;
+
 public static class StaticCallConfig
 {
-    public static readonly List<(string ClassName, string MethodName)> Patterns = new()
+    // Shared with the Python orchestrators; copied next to the binary by the project file
+    public const string RegistryFileName = "static_patterns.json";
+
+    // Used when the registry file cannot be found
+    private static readonly List<(string ClassName, string MethodName)> DefaultPatterns = new()
     {
         ("DateTime", "Now"),
         ("DateTime", "UtcNow"),
@@ -8,4 +14,53 @@ public static class StaticCallConfig
         ("Directory", "Exists"),
         ("Guid", "NewGuid")
     };
+
+    public static readonly List<(string ClassName, string MethodName)> Patterns = LoadPatterns();
+
+    private static readonly HashSet<(string ClassName, string MethodName)> PatternSet = new(Patterns);
+
+    // O(1) check regardless of how many patterns the registry holds
+    public static bool IsTracked(string className, string methodName) =>
+        PatternSet.Contains((className, methodName));
+
+    private static List<(string ClassName, string MethodName)> LoadPatterns()
+    {
+        var path = new[]
+        {
+            Environment.GetEnvironmentVariable("STATIC_PATTERNS_FILE"),
+            Path.Combine(AppContext.BaseDirectory, RegistryFileName),
+            Path.Combine(Directory.GetCurrentDirectory(), RegistryFileName)
+        }.FirstOrDefault(p => !string.IsNullOrEmpty(p) && File.Exists(p));
+
+        if (path == null)
+        {
+            return DefaultPatterns;
+        }
+
+        using var document = JsonDocument.Parse(File.ReadAllText(path));
+        var patterns = new List<(string ClassName, string MethodName)>();
+        foreach (var entry in document.RootElement.GetProperty("types").EnumerateArray())
+        {
+            if (entry.TryGetProperty("enabled", out var enabled) && enabled.ValueKind == JsonValueKind.False)
+            {
+                continue;
+            }
+
+            var className = entry.GetProperty("type").GetString()!;
+            foreach (var key in new[] { "properties", "methods" })
+            {
+                if (!entry.TryGetProperty(key, out var members))
+                {
+                    continue;
+                }
+
+                foreach (var member in members.EnumerateArray())
+                {
+                    patterns.Add((className, member.GetString()!));
+                }
+            }
+        }
+
+        return patterns;
+    }
 }
@@ -11,19 +11,170 @@ Usage with Agent Framework:
     tools = TestGenerationTools()
     agent = AzureOpenAIChatClient(credential=...).create_agent(
         instructions="You are a test generation expert",
-        tools=[tools.analyze_static_method, tools.generate_mock_test]
+        tools=[
+            tools.analyze_static_method,
+            tools.analyze_static_methods,
+            tools.generate_mock_test,
+            tools.generate_mock_tests,
+            tools.generate_test_class,
+        ]
     )
 """
 
-from typing import Annotated, Optional
+from functools import lru_cache
+from string import Formatter
+from typing import Annotated, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 from pydantic import Field
-import re
 import os
 
+from csharp_lexer import is_identifier
+from generated_test_writer import GeneratedTestWriter
+from symbol_index import LineRange, ParsedFile, SymbolIndex
+
+# Test templates, as str.format strings. They are assembled once into
+# TestTemplates below, so rendering a test is a single str.format call.
+TEST_FILE_HEADER = """using Xunit;
+using System;
+
+namespace GeneratedTests
+{{
+    /// <summary>
+    /// Auto-generated test for {class_name}.{method_name}
+    /// This test focuses on the behavior of the containing method/class, not on the static call itself.
+    /// </summary>
+    public class {class_name}_{method_name}_Tests
+    {{
+"""
+
+TEST_CLASS_HEADER = """using Xunit;
+using System;
+{usings}
+namespace {test_namespace}
+{{
+    /// <summary>
+    /// Auto-generated tests for {qualified_class_name}
+    /// These tests focus on the behavior of the containing methods, not on the static calls themselves.
+    /// </summary>
+    public class {test_class_name}
+    {{
+"""
+
+TEST_METHOD = """        [Fact]
+        public void {test_method_name}()
+        {{
+            // Arrange
+            // TODO: Create necessary test data and configure dependencies
+            {placeholders}
+
+            // Act
+            {invocation}
+
+            // Assert
+            // TODO: Add assertions that validate the behavior of the method
+            Assert.True(true);
+        }}"""
+
+TEST_FILE_FOOTER = """
+    }}
+}}
+"""
+
+# Act sections for static and instance targets
+STATIC_INVOCATION = "var result = {class_name}.{method_name}({arguments});"
+INSTANCE_INVOCATION = (
+    "var target = new {class_name}();\n            var result = target.{method_name}({arguments});"
+)
+
+# Separates the tests of a class
+TEST_METHOD_SEPARATOR = "\n\n"
+# Precedes each file when a batch is rendered into one buffer
+BATCH_FILE_HEADER = "// File: {file_name}\n"
+
+
+class TestTemplate:
+    """
+    A str.format template whose replacement fields are checked once.
+
+    Templates only use plain {field} replacements, so a bad field is reported
+    when the module is imported rather than the first time a test is rendered.
+    """
+
+    def __init__(self, template: str, name: str = "template"):
+        """
+        Args:
+            template: str.format template with plain {field} replacements
+            name: Name shown in errors about the template
+
+        Raises:
+            ValueError: If a replacement field is not a plain identifier
+        """
+        fields: List[str] = []
+        for _, field, format_spec, conversion in Formatter().parse(template):
+            if field is None:
+                continue
+            if not field.isidentifier() or format_spec or conversion:
+                raise ValueError(f"Unsupported field in {name} template: {field!r}")
+            if field not in fields:
+                fields.append(field)
+        self.name = name
+        self.template = template
+        self.fields = tuple(fields)
+        # Renders the template from keyword field values; unknown keywords are ignored
+        self.render: Callable[..., str] = template.format
+
+
+def _with_invocation(template: str, test_method_name: str, is_static: bool) -> str:
+    """Complete TEST_METHOD inside a template for a static or instance target."""
+    invocation = STATIC_INVOCATION if is_static else INSTANCE_INVOCATION
+    return template.replace("{invocation}", invocation).replace("{test_method_name}", test_method_name)
+
+
+# Assembled templates, keyed by whether the target method is static
+TEST_FILES = {
+    is_static: TestTemplate(
+        TEST_FILE_HEADER
+        + _with_invocation(TEST_METHOD, "Test_{method_name}_Behavior", is_static)
+        + TEST_FILE_FOOTER,
+        "test file",
+    )
+    for is_static in (True, False)
+}
+TEST_METHODS = {
+    is_static: TestTemplate(_with_invocation(TEST_METHOD, "{test_method_name}", is_static), "test method")
+    for is_static in (True, False)
+}
+TEST_CLASS_HEADERS = TestTemplate(TEST_CLASS_HEADER, "test class header")
+TEST_FILE_FOOTERS = TestTemplate(TEST_FILE_FOOTER, "test file footer")
+BATCH_FILE_HEADERS = TestTemplate(BATCH_FILE_HEADER, "batch file header")
+
+
+@lru_cache(maxsize=4096)
+def _argument_slots(parameters: str) -> Tuple[str, str]:
+    """Return the call arguments and Arrange placeholders for a parameter list."""
+    # Clean up parameters
+    count = len([param for param in parameters.split(",") if param.strip()])
+    return ", ".join(["/*arg*/"] * count), "// Parameter placeholder\n            " * count
+
+
+# Records what generate_mock_tests wrote into an output_dir, inside that directory
+MOCK_TESTS_MANIFEST = ".generated_tests_manifest.json"
+
+# Parsed files shared by every TestGenerationTools in the process
+SHARED_SYMBOL_INDEX = SymbolIndex()
+
 
 class TestGenerationTools:
+
     """Tools for generating unit tests for static methods."""
     
+    def __init__(self, symbol_index: Optional[SymbolIndex] = None):
+        """
+        Args:
+            symbol_index: Cache of parsed C# files; defaults to one shared by
+                every TestGenerationTools in the process
+        """
+        self.symbol_index = symbol_index or SHARED_SYMBOL_INDEX
+
     def analyze_static_method(
         self,
         file_path: Annotated[str, Field(description="Path to the C# file containing the static method")],
@@ -37,39 +188,72 @@ class TestGenerationTools:
         - Parameters
         - Usage context
         - Dependencies
+        
+        The context is the full declaration and body of the method named by
+        the signature, or of the method containing it (e.g. for a static call
+        such as 'DateTime.Now').
         """
         if not os.path.exists(file_path):
             return f"Error: File {file_path} not found"
         
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-            
-            # Look for the method
-            method_pattern = re.escape(method_signature)
-            if re.search(method_pattern, content):
-                # Extract surrounding code for context
-                lines = content.split('\n')
-                method_line = None
-                for i, line in enumerate(lines):
-                    if method_signature in line:
-                        method_line = i
-                        break
-                
-                if method_line is not None:
-                    # Get context around the method
-                    start = max(0, method_line - 5)
-                    end = min(len(lines), method_line + 10)
-                    context = '\n'.join(lines[start:end])
-                    
-                    return f"Found method '{method_signature}' in {file_path}\n\nContext:\n{context}"
-                else:
-                    return f"Method pattern '{method_signature}' found but could not extract context"
-            else:
-                return f"Method '{method_signature}' not found in {file_path}"
+            parsed = self.symbol_index.get(file_path)
+            return self._describe_lookup(parsed, file_path, method_signature, parsed.lookup(method_signature))
         
         except Exception as e:
             return f"Error analyzing file: {str(e)}"
+
+    def analyze_static_methods(
+        self,
+        file_path: Annotated[Optional[str], Field(description="Path to the C# file that method_signatures refer to")] = None,
+        method_signatures: Annotated[Optional[List[str]], Field(description="Static method signatures to analyze in file_path")] = None,
+        targets: Annotated[Optional[List[List[str]]], Field(description="[file_path, method_signature] pairs, for signatures across several files")] = None,
+    ) -> str:
+        """
+        Analyze several static methods in one call, reading each file once.
+        
+        Takes signatures for one file (file_path and method_signatures),
+        [file_path, method_signature] pairs across files (targets), or both.
+        Results are grouped by file, in the order files are first named, and
+        each result reads like analyze_static_method's, separated by '---'.
+        """
+        signatures_by_file: Dict[str, List[str]] = {}
+        if method_signatures:
+            if not file_path:
+                return "Error: method_signatures requires file_path"
+            signatures_by_file.setdefault(file_path, []).extend(method_signatures)
+        for target in targets or []:
+            if not isinstance(target, (list, tuple)) or len(target) != 2:
+                return f"Error: Each target must be a [file_path, method_signature] pair, got {target!r}"
+            signatures_by_file.setdefault(target[0], []).append(target[1])
+        if not signatures_by_file:
+            return "Error: No method signatures given"
+        
+        sections = []
+        for path, signatures in signatures_by_file.items():
+            sections.append(f"=== {path} ===\n{self._analyze_file(path, signatures)}")
+        return "\n\n".join(sections)
+
+    def _analyze_file(self, file_path: str, signatures: List[str]) -> str:
+        """Describe every signature in one file from a single parse."""
+        if not os.path.exists(file_path):
+            return f"Error: File {file_path} not found"
+        
+        try:
+            parsed = self.symbol_index.get(file_path)
+            results = parsed.lookup_many(signatures)
+            return "\n---\n".join(
+                self._describe_lookup(parsed, file_path, signature, lines) for signature, lines in results.items()
+            )
+        
+        except Exception as e:
+            return f"Error analyzing file: {str(e)}"
+
+    def _describe_lookup(self, parsed: ParsedFile, file_path: str, signature: str, lines: Optional[LineRange]) -> str:
+        """Format one lookup result as analyze_static_method reports it."""
+        if lines is None:
+            return f"Method '{signature}' not found in {file_path}"
+        return f"Found method '{signature}' in {file_path}\n\nContext:\n{parsed.text(*lines)}"
     
     def generate_mock_test(
         self,
@@ -84,60 +268,115 @@ class TestGenerationTools:
         
         Creates a basic test scaffold using xUnit and Moq that can be extended.
         """
+        arguments, placeholders = _argument_slots(parameters)
+        return TEST_FILES[bool(is_static)].render(
+            class_name=class_name, method_name=method_name, arguments=arguments, placeholders=placeholders
+        )
+
+    def generate_mock_tests(
+        self,
+        methods: Annotated[List[Dict[str, Any]], Field(description="Methods to test, each a dict with 'class_name', 'method_name' and optional 'parameters' and 'is_static'")],
+        output_dir: Annotated[Optional[str], Field(description="Directory to write one <test class>.cs file per method into; omit to return the tests")] = None,
+    ) -> str:
+        """
+        Generate mock-based unit tests for many methods in one call.
         
-        # Clean up parameters
-        param_list = []
-        if parameters.strip():
-            for param in parameters.split(','):
-                param = param.strip()
-                if param:
-                    param_list.append(param)
-        
-        # Generate test class name
-        test_class_name = f"{class_name}_{method_name}_Tests"
-
-        # Generate test method name
-        test_method_name = f"Test_{method_name}_Behavior"
-
-        # Determine invocation: static vs instance
-        if is_static:
-            invocation = f"var result = {class_name}.{method_name}({', '.join(['/*arg*/' for _ in param_list])});"
-        else:
-            invocation = (
-                f"var target = new {class_name}();\n            var result = target.{method_name}({', '.join(['/*arg*/' for _ in param_list])});"
-            )
+        Produces the same test files as generate_mock_test. With output_dir
+        each file is written to disk through a GeneratedTestWriter, so files
+        whose content is unchanged are left alone; class and method names
+        must then be plain C# identifiers, which keeps every file inside
+        output_dir. Otherwise all files are rendered into one buffer, each
+        preceded by a `// File: <name>.cs` line.
+        """
+        if output_dir:
+            for method in methods:
+                for key in ("class_name", "method_name"):
+                    if not is_identifier(str(method.get(key, ""))):
+                        return f"Error: {key} must be a C# identifier, got {method.get(key)!r}"
 
-        # Build the test file content with Arrange/Act/Assert sections
-        test_content = f"""using Xunit;
-using System;
+            writer = GeneratedTestWriter(output_dir, os.path.join(output_dir, MOCK_TESTS_MANIFEST))
+            for test_class_name, content in self.iter_mock_tests(methods):
+                writer.write(os.path.join(output_dir, f"{test_class_name}.cs"), content, "")
+            # Other files in output_dir are not ours to remove
+            stats = writer.close(remove_stale=False)
+            message = f"Wrote {stats['written']} test files to {output_dir} ({stats['unchanged']} unchanged)"
+            if stats["failed"]:
+                message += f"; {stats['failed']} failed"
+            return message
 
-namespace GeneratedTests
-{{
-    /// <summary>
-    /// Auto-generated test for {class_name}.{method_name}
-    /// This test focuses on the behavior of the containing method/class, not on the static call itself.
-    /// </summary>
-    public class {test_class_name}
-    {{
-        [Fact]
-        public void {test_method_name}()
-        {{
-            // Arrange
-            // TODO: Create necessary test data and configure dependencies
-            {(''.join(['// Parameter placeholder\n            ' for _ in param_list]))}
+        # One shared buffer, joined once at the end
+        buffer: List[str] = []
+        write = buffer.append
+        file_header = BATCH_FILE_HEADERS.render
+        for test_class_name, content in self.iter_mock_tests(methods):
+            write(file_header(file_name=f"{test_class_name}.cs"))
+            write(content)
+        return "".join(buffer)
 
-            // Act
-            {invocation}
+    def iter_mock_tests(self, methods: Iterable[Dict[str, Any]]) -> Iterator[Tuple[str, str]]:
+        """
+        Render the test file of each method, as generate_mock_test would.
+        
+        Args:
+            methods: Dicts with 'class_name', 'method_name' and optional
+                'parameters' and 'is_static'
+        
+        Yields:
+            (test class name, test file content) in input order
+        """
+        static_file = TEST_FILES[True].render
+        instance_file = TEST_FILES[False].render
+        for method in methods:
+            class_name = method["class_name"]
+            method_name = method["method_name"]
+            arguments, placeholders = _argument_slots(method.get("parameters", ""))
+            render = static_file if method.get("is_static") else instance_file
+            yield f"{class_name}_{method_name}_Tests", render(
+                class_name=class_name, method_name=method_name, arguments=arguments, placeholders=placeholders
+            )
 
-            // Assert
-            // TODO: Add assertions that validate the behavior of the method
-            Assert.True(true);
-        }}
-    }}
-}}
-"""
+    def generate_test_class(
+        self,
+        class_name: Annotated[str, Field(description="Name of the class being tested")],
+        methods: Annotated[List[Dict[str, Any]], Field(description="Methods to test, each a dict with 'method_name' and optional 'parameters' and 'is_static'")],
+        namespace: Annotated[str, Field(description="Namespace of the class being tested (e.g., 'Volo.Abp.Timing')")] = "",
+        test_class_name: Annotated[Optional[str], Field(description="Name of the generated test class (defaults to '<class_name>_Tests')")] = None,
+    ) -> str:
+        """
+        Generate one test class covering several methods of a class.
         
-        return test_content
+        Each method gets a Test_<method>_Behavior fact; overloads get _2, _3, ...
+        in the order given so every test name is unique. The class is placed in
+        GeneratedTests.<namespace> and imports <namespace>, so classes with the
+        same name in different namespaces do not collide.
+        """
+        pieces = [TEST_CLASS_HEADERS.render(
+            usings=f"using {namespace};\n" if namespace else "",
+            test_namespace=f"GeneratedTests.{namespace}" if namespace else "GeneratedTests",
+            qualified_class_name=f"{namespace}.{class_name}" if namespace else class_name,
+            test_class_name=test_class_name or f"{class_name}_Tests",
+        )]
+
+        seen: Dict[str, int] = {}
+        for index, method in enumerate(methods):
+            method_name = method["method_name"]
+            test_method_name = f"Test_{method_name}_Behavior"
+            seen[test_method_name] = seen.get(test_method_name, 0) + 1
+            if seen[test_method_name] > 1:
+                test_method_name += f"_{seen[test_method_name]}"
+            if index:
+                pieces.append(TEST_METHOD_SEPARATOR)
+            arguments, placeholders = _argument_slots(method.get("parameters", ""))
+            pieces.append(TEST_METHODS[bool(method.get("is_static"))].render(
+                class_name=class_name,
+                method_name=method_name,
+                test_method_name=test_method_name,
+                arguments=arguments,
+                placeholders=placeholders,
+            ))
+
+        pieces.append(TEST_FILE_FOOTERS.render())
+        return "".join(pieces)
     
     def get_moq_setup_template(
         self,
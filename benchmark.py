@@ -0,0 +1,465 @@
+"""
+Benchmark Suite
+
+Measures the scan and test generation hot paths on a synthetic C# tree, with
+no .NET SDK required:
+
+- find_static_method_calls       scan + method extraction over the whole tree
+- find_static_methods_in_file    method extraction, one file at a time
+- generate_mock_test             rendering a test per extracted method, one call each
+- generate_mock_tests            the same tests rendered by one batch call into a shared buffer
+- generate_unit_tests_with_agent extraction + rendering + writing GeneratedTests
+- scan_registry_default          scanning file contents with the enabled registry patterns
+- scan_registry_large            the same with the registry padded to REGISTRY_SCALE patterns
+                                 (should stay close to scan_registry_default)
+
+The corpus is generated deterministically from its parameters (file count,
+file size, pattern density, directory depth, seed) and cached, so runs with
+the same parameters measure the same input. Each benchmark reports files/s,
+matches/s, MB/s and peak traced Python memory. Results can be saved as a
+baseline; later runs fail (exit code 1) when a benchmark gets slower or
+uses more memory than the baseline by more than the threshold.
+
+Usage:
+    python benchmark.py --files 2000 --file-kb 8 --density 0.2 --save-baseline
+    python benchmark.py --files 2000 --file-kb 8 --density 0.2 --threshold 0.15
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+DEFAULT_BASELINE = os.path.join('test_logs', 'benchmark_baseline.json')
+
+# Bump when the generated corpus changes for the same parameters
+CORPUS_VERSION = 1
+
+# Differences below these are noise and never count as regressions
+MIN_SECONDS_DELTA = 0.01
+MIN_PEAK_MB_DELTA = 1.0
+
+# Pattern count of the padded registry in scan_registry_large
+REGISTRY_SCALE = 1000
+
+# Code snippets that produce a hit for each static pattern
+PATTERN_SNIPPETS = {
+    'DateTime.Now': 'var now = DateTime.Now;',
+    'DateTime.UtcNow': 'var stamp = DateTime.UtcNow.Ticks;',
+    'File.Exists': 'if (File.Exists(path)) { return true; }',
+    'Directory.Exists': 'var found = Directory.Exists(System.IO.Path.GetDirectoryName(path));',
+    'Guid.NewGuid': 'var id = Guid.NewGuid();',
+}
+
+# Filler statements with no static pattern hits
+FILLER_STATEMENTS = [
+    'var total = items.Count + offset;',
+    'logger.LogDebug("Processing {Name}", name);',
+    'if (value == null) { throw new ArgumentNullException(nameof(value)); }',
+    'foreach (var item in items) { total += item.Length; }',
+    'var text = string.Join(", ", items);',
+    'result = await repository.FindAsync(id, cancellationToken);',
+    '// DateTime is passed in by the caller',
+    'var message = "checked File.Exists earlier";',
+    '// TODO: stop calling DateTime.Now directly',
+]
+
+
+@dataclass
+class CorpusSpec:
+    """Parameters of a synthetic C# tree."""
+
+    files: int = 500
+    file_kb: int = 8
+    density: float = 0.2
+    depth: int = 3
+    seed: int = 1
+
+    @property
+    def key(self) -> str:
+        """Stable identifier of the corpus parameters."""
+        params = dict(asdict(self), version=CORPUS_VERSION)
+        return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()[:12]
+
+
+@dataclass
+class BenchmarkResult:
+    """Throughput and memory of one benchmark."""
+
+    name: str
+    seconds: float
+    files: int
+    matches: int
+    megabytes: float
+    peak_mb: float
+
+    @property
+    def files_per_s(self) -> float:
+        return self.files / self.seconds if self.seconds else 0.0
+
+    @property
+    def matches_per_s(self) -> float:
+        return self.matches / self.seconds if self.seconds else 0.0
+
+    @property
+    def mb_per_s(self) -> float:
+        return self.megabytes / self.seconds if self.seconds else 0.0
+
+
+def _render_method(rng: random.Random, class_name: str, index: int, density: float) -> str:
+    """Render one method, containing a static pattern with probability `density`."""
+    is_static = rng.random() < 0.3
+    generic = '<T>' if rng.random() < 0.1 else ''
+    params = rng.choice(['', 'string path', 'Guid id, int count', 'IList<string> items, int offset'])
+    body = [rng.choice(FILLER_STATEMENTS) for _ in range(rng.randint(2, 8))]
+    if rng.random() < density:
+        body.insert(rng.randrange(len(body) + 1), PATTERN_SNIPPETS[rng.choice(sorted(PATTERN_SNIPPETS))])
+
+    if rng.random() < 0.1:
+        # Expression-bodied member
+        return f"        public {'static ' if is_static else ''}int Count{index}{generic}({params}) => {index} + 1;\n"
+
+    modifiers = 'public static' if is_static else rng.choice(['public', 'private', 'protected virtual'])
+    lines = '\n'.join(f'            {statement}' for statement in body)
+    return (
+        f"        /// <summary>Runs step {index} of {class_name}.</summary>\n"
+        f"        {modifiers} void Run{index}{generic}({params})\n"
+        f"        {{\n{lines}\n        }}\n\n"
+    )
+
+
+def _render_file(rng: random.Random, namespace: str, file_index: int, spec: CorpusSpec) -> str:
+    """Render one C# file of roughly spec.file_kb kilobytes."""
+    target = spec.file_kb * 1024
+    parts = [
+        'using System;\nusing System.Collections.Generic;\nusing System.IO;\n\n',
+        f'namespace {namespace}\n{{\n',
+    ]
+    size = sum(len(p) for p in parts)
+    classes = rng.randint(1, 3)
+    for class_index in range(classes):
+        class_name = f'Service{file_index}_{class_index}'
+        header = f'    public class {class_name}\n    {{\n'
+        parts.append(header)
+        size += len(header)
+        method_index = 0
+        # Share the file between its classes, with at least one method each
+        while method_index == 0 or size < target * (class_index + 1) / classes:
+            method = _render_method(rng, class_name, method_index, spec.density)
+            parts.append(method)
+            size += len(method)
+            method_index += 1
+        parts.append('    }\n\n')
+        size += 7
+    parts.append('}\n')
+    return ''.join(parts)
+
+
+def generate_corpus(root: str, spec: CorpusSpec) -> List[str]:
+    """
+    Write a deterministic synthetic C# tree.
+
+    Args:
+        root: Directory to create the files in
+        spec: Corpus parameters
+
+    Returns:
+        Paths of the generated files
+    """
+    rng = random.Random(spec.seed)
+    paths = []
+    for file_index in range(spec.files):
+        segments = [f'Module{rng.randrange(8)}'] + [f'Part{rng.randrange(4)}' for _ in range(rng.randint(0, spec.depth))]
+        namespace = 'Bench.' + '.'.join(segments)
+        directory = os.path.join(root, *segments)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'Service{file_index}.cs')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(_render_file(rng, namespace, file_index, spec))
+        paths.append(path)
+    return paths
+
+
+def ensure_corpus(cache_dir: str, spec: CorpusSpec) -> str:
+    """Return the corpus directory for spec, generating it if it is not cached."""
+    root = os.path.join(cache_dir, spec.key)
+    marker = os.path.join(root, '.complete')
+    if not os.path.exists(marker):
+        shutil.rmtree(root, ignore_errors=True)
+        generate_corpus(root, spec)
+        with open(marker, 'w', encoding='utf-8') as f:
+            json.dump(asdict(spec), f)
+    return root
+
+
+def padded_registry(count: int, seed: int = 1) -> 'pattern_registry.PatternRegistry':
+    """
+    Return every registry pattern (enabled or not) plus synthetic ones, `count` in total.
+
+    Synthetic types get five methods each, like real registry entries
+    listing several members of one type.
+    """
+    from pattern_registry import PatternRegistry, StaticPattern, load_registry
+
+    rng = random.Random(seed)
+    patterns = list(load_registry(include_disabled=True))
+    while len(patterns) < count:
+        type_name = 'Bench' + ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(3, 10)))
+        if any(p.type_name == type_name for p in patterns):
+            continue
+        patterns.extend(
+            StaticPattern(type_name=type_name, member=f'Member{i}', kind='method', group='Benchmark')
+            for i in range(5)
+        )
+    return PatternRegistry(patterns[:count])
+
+
+def measure(name: str, run: Callable[[], Tuple[int, int, int]], repeat: int) -> BenchmarkResult:
+    """
+    Time a benchmark (best of `repeat`), then run it once more under tracemalloc.
+
+    Args:
+        name: Benchmark name
+        run: Runs the workload and returns (files, matches, bytes) processed
+        repeat: Number of timed runs
+
+    Returns:
+        BenchmarkResult with the fastest time and the traced peak memory
+    """
+    best = None
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        files, matches, size = run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    # Tracing slows allocation-heavy code, so memory is measured separately
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return BenchmarkResult(
+        name=name,
+        seconds=best,
+        files=files,
+        matches=matches,
+        megabytes=size / (1024 * 1024),
+        peak_mb=peak / (1024 * 1024),
+    )
+
+
+def run_benchmarks(corpus: str, workers: int, repeat: int, only: Optional[List[str]] = None) -> List[BenchmarkResult]:
+    """
+    Run the hot-path benchmarks against a corpus.
+
+    Must be called with a scratch working directory: the orchestrator writes
+    its logs and GeneratedTests relative to the current directory.
+    """
+    import test_orchestrator
+    from agent_tools import TestGenerationTools
+
+    def orchestrator() -> 'test_orchestrator.TestOrchestrator':
+        instance = test_orchestrator.TestOrchestrator(workers=workers, use_index=False, discovery='walk')
+        instance.logger.setLevel(logging.WARNING)
+        return instance
+
+    # Shared inputs for the per-file and generation benchmarks
+    reference = orchestrator()
+    static_files = reference.find_static_method_calls(corpus)
+    hit_files = sorted(reference.scan_results)
+    hit_bytes = sum(os.path.getsize(path) for path in hit_files)
+    corpus_files = sorted(reference.scanned_files)
+    corpus_bytes = sum(os.path.getsize(path) for path in corpus_files)
+    matches = sum(scan.total_hits for scan in reference.scan_results.values())
+    methods = [(path, m) for path in hit_files for m in reference.file_methods[path]]
+
+    def scan_tree():
+        instance = orchestrator()
+        found = instance.find_static_method_calls(corpus)
+        return len(instance.scanned_files), sum(len(files) for files in found.values()), corpus_bytes
+
+    def extract_files():
+        instance = orchestrator()
+        extracted = sum(len(instance.find_static_methods_in_file(path)) for path in hit_files)
+        return len(hit_files), extracted, hit_bytes
+
+    tools = TestGenerationTools()
+
+    def render_tests():
+        size = 0
+        for _, (class_name, method_name, parameters, is_static) in methods:
+            size += len(tools.generate_mock_test(
+                class_name=class_name,
+                method_name=method_name.replace('.', '_'),
+                return_type='dynamic',
+                parameters=parameters,
+                is_static=is_static,
+            ))
+        return len(hit_files), len(methods), size
+
+    descriptors = [
+        {
+            'class_name': class_name,
+            'method_name': method_name.replace('.', '_'),
+            'parameters': parameters,
+            'is_static': is_static,
+        }
+        for _, (class_name, method_name, parameters, is_static) in methods
+    ]
+
+    def render_tests_batch():
+        return len(hit_files), len(methods), len(tools.generate_mock_tests(descriptors))
+
+    def generate_tests():
+        # Start from an empty output directory so every test is written
+        shutil.rmtree(test_orchestrator.GENERATED_TESTS_DIR, ignore_errors=True)
+        if os.path.exists(test_orchestrator.GENERATED_MANIFEST):
+            os.remove(test_orchestrator.GENERATED_MANIFEST)
+        instance = orchestrator()
+        generated = instance.generate_unit_tests_with_agent(static_files)
+        return len(hit_files), generated, hit_bytes
+
+    from pattern_registry import load_registry
+    from static_scanner import StaticCallScanner, decode_source
+
+    sources = []
+    for path in hit_files:
+        with open(path, 'rb') as f:
+            sources.append(decode_source(f.read()))
+
+    def scan_with(registry):
+        scanner = StaticCallScanner(registry)
+
+        def run():
+            found = sum(scanner.scan_text(content).total_hits for content in sources)
+            return len(sources), found, hit_bytes
+        return run
+
+    benchmarks = {
+        'find_static_method_calls': scan_tree,
+        'find_static_methods_in_file': extract_files,
+        'generate_mock_test': render_tests,
+        'generate_mock_tests': render_tests_batch,
+        'generate_unit_tests_with_agent': generate_tests,
+        'scan_registry_default': scan_with(load_registry()),
+        'scan_registry_large': scan_with(padded_registry(REGISTRY_SCALE)),
+    }
+    print(f"Corpus: {len(corpus_files)} files, {corpus_bytes / (1024 * 1024):.1f} MB, "
+          f"{len(hit_files)} files with {matches} static calls, {len(methods)} methods")
+
+    results = []
+    for name, run in benchmarks.items():
+        if only and name not in only:
+            continue
+        results.append(measure(name, run, repeat))
+    return results
+
+
+def compare(results: List[BenchmarkResult], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    """
+    Compare results with a baseline.
+
+    Returns:
+        Descriptions of every regression beyond the threshold
+    """
+    regressions = []
+    for result in results:
+        previous = baseline.get(result.name)
+        if not previous:
+            continue
+        for field_name, label, floor in (
+            ('seconds', 'time', MIN_SECONDS_DELTA),
+            ('peak_mb', 'peak memory', MIN_PEAK_MB_DELTA),
+        ):
+            before, after = previous[field_name], getattr(result, field_name)
+            if after > before * (1 + threshold) and after - before > floor:
+                regressions.append(
+                    f"{result.name}: {label} {before:.3f} -> {after:.3f} (+{(after / before - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def print_results(results: List[BenchmarkResult], baseline: Dict[str, dict]):
+    """Print a results table, with the change in time against the baseline."""
+    print(f"{'benchmark':32} {'seconds':>9} {'files/s':>10} {'matches/s':>11} {'MB/s':>8} {'peak MB':>8} {'vs base':>8}")
+    for result in results:
+        previous = baseline.get(result.name)
+        change = f"{(result.seconds / previous['seconds'] - 1) * 100:+.0f}%" if previous and previous['seconds'] else ''
+        print(
+            f"{result.name:32} {result.seconds:9.3f} {result.files_per_s:10.0f} {result.matches_per_s:11.0f} "
+            f"{result.mb_per_s:8.1f} {result.peak_mb:8.1f} {change:>8}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark the static call scan and test generation hot paths")
+    parser.add_argument('--files', type=int, default=CorpusSpec.files, help="Number of C# files (default: %(default)s)")
+    parser.add_argument('--file-kb', type=int, default=CorpusSpec.file_kb, help="Approximate file size in KB (default: %(default)s)")
+    parser.add_argument('--density', type=float, default=CorpusSpec.density,
+                        help="Fraction of methods containing a static call (default: %(default)s)")
+    parser.add_argument('--depth', type=int, default=CorpusSpec.depth, help="Maximum directory nesting (default: %(default)s)")
+    parser.add_argument('--seed', type=int, default=CorpusSpec.seed, help="Corpus random seed (default: %(default)s)")
+    parser.add_argument('--workers', type=int, default=1, help="Orchestrator worker processes (default: %(default)s)")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per benchmark; the fastest counts (default: %(default)s)")
+    parser.add_argument('--only', nargs='+', metavar='NAME', help="Run only these benchmarks")
+    parser.add_argument('--corpus-dir', default=os.path.join(tempfile.gettempdir(), 'static-call-bench'),
+                        help="Where generated corpora are cached (default: %(default)s)")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Baseline JSON file (default: %(default)s)")
+    parser.add_argument('--save-baseline', action='store_true', help="Store these results as the baseline")
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help="Allowed slowdown or memory growth before failing, as a fraction (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    spec = CorpusSpec(files=args.files, file_kb=args.file_kb, density=args.density, depth=args.depth, seed=args.seed)
+    baseline_path = os.path.abspath(args.baseline)
+    corpus = ensure_corpus(os.path.abspath(args.corpus_dir), spec)
+    # Baselines are only comparable for the same corpus and worker count
+    baseline_key = f'{spec.key}-w{args.workers}'
+    try:
+        with open(baseline_path, 'r', encoding='utf-8') as f:
+            baselines = json.load(f)
+    except (OSError, ValueError):
+        baselines = {}
+    baseline = baselines.get(baseline_key, {}).get('results', {})
+
+    original_cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='static-call-bench-') as workdir:
+        os.chdir(workdir)
+        try:
+            results = run_benchmarks(corpus, args.workers, args.repeat, args.only)
+        finally:
+            os.chdir(original_cwd)
+            logging.shutdown()
+
+    print_results(results, baseline)
+
+    if args.save_baseline:
+        entry = baselines.setdefault(baseline_key, {'corpus': asdict(spec), 'workers': args.workers, 'results': {}})
+        entry['results'].update({result.name: asdict(result) for result in results})
+        os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump(baselines, f, indent=1, sort_keys=True)
+        print(f"Baseline saved to {baseline_path}")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
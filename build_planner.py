@@ -0,0 +1,222 @@
+"""
+Build Planner
+
+Works out which .csproj projects need rebuilding after a set of files changed,
+so the orchestrator can run `dotnet build` on just those projects instead of
+the full build/build-all.ps1 script.
+
+Each changed file is mapped to its owning project (the nearest .csproj in an
+enclosing directory, matching SDK-style default globbing). Projects that
+reference an affected project through <ProjectReference> are affected too.
+Only affected projects that no other affected project depends on are built,
+because `dotnet build` already builds a project's references.
+
+Usage:
+    planner = BuildPlanner('./cloned_repos/abp')
+    plan = planner.plan(changed_files)
+    for command in planner.build_commands(plan):
+        subprocess.run(command)
+"""
+
+import os
+import re
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set
+
+from static_scanner import SKIP_DIRS
+
+# Command used to invoke the .NET CLI; point at a stand-in script to test plans
+DOTNET = os.environ.get('DOTNET', 'dotnet')
+
+# Files other than C# sources whose changes alter what a build produces
+PROJECT_FILES = ('.csproj', '.props', '.targets', '.sln', 'global.json')
+
+# Directories that never contain projects worth building
+PROJECT_SKIP_DIRS = set(SKIP_DIRS) - {'GeneratedTests'} | {'node_modules'}
+
+
+@dataclass
+class BuildPlan:
+    """Projects affected by a change set and the subset that must be built."""
+
+    affected: List[str] = field(default_factory=list)
+    targets: List[str] = field(default_factory=list)
+    unowned: List[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.targets)
+
+
+def is_test_project(project: str) -> bool:
+    """
+    Whether a .csproj is a test project.
+
+    Test projects either follow the *.Tests naming convention, reference the
+    test SDK, or set <IsTestProject>.
+    """
+    name = os.path.basename(project)[:-len('.csproj')]
+    if name.endswith(('.Tests', '.Test')):
+        return True
+    try:
+        with open(project, 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+    except OSError:
+        return False
+    return 'Microsoft.NET.Test.Sdk' in content or re.search(r'<IsTestProject>\s*true', content, re.I) is not None
+
+
+class BuildPlanner:
+    """Resolves changed files to the minimal set of projects to build."""
+
+    def __init__(self, root_dir: str, dotnet: str = DOTNET):
+        """
+        Discover projects and their references under a root directory.
+
+        Args:
+            root_dir: Directory to search for .csproj files
+            dotnet: .NET CLI command used in build commands
+        """
+        self.root_dir = os.path.abspath(root_dir)
+        self.dotnet = dotnet
+        self.projects_by_dir: Dict[str, List[str]] = {}
+        self.references: Dict[str, Set[str]] = {}
+        self.dependents: Dict[str, Set[str]] = {}
+        self._owner_cache: Dict[str, List[str]] = {}
+
+        for root, dirs, files in os.walk(self.root_dir):
+            dirs[:] = [d for d in dirs if d not in PROJECT_SKIP_DIRS]
+            projects = sorted(os.path.join(root, f) for f in files if f.endswith('.csproj'))
+            if projects:
+                self.projects_by_dir[root] = projects
+
+        for projects in self.projects_by_dir.values():
+            for project in projects:
+                self.references[project] = self._read_project_references(project)
+                self.dependents.setdefault(project, set())
+
+        for project, references in self.references.items():
+            for reference in references:
+                self.dependents.setdefault(reference, set()).add(project)
+
+    @property
+    def projects(self) -> List[str]:
+        """All discovered project files."""
+        return sorted(self.references)
+
+    @property
+    def test_projects(self) -> List[str]:
+        """Discovered projects that `dotnet test` can run."""
+        return [project for project in self.projects if is_test_project(project)]
+
+    @staticmethod
+    def _read_project_references(project: str) -> Set[str]:
+        """Return the absolute paths of a project's <ProjectReference> items."""
+        references = set()
+        project_dir = os.path.dirname(project)
+        try:
+            for _, element in ET.iterparse(project):
+                if element.tag.rsplit('}', 1)[-1] != 'ProjectReference':
+                    continue
+                include = element.get('Include', '')
+                # Skip references built from MSBuild properties we cannot evaluate
+                if not include or '$(' in include:
+                    continue
+                path = os.path.normpath(os.path.join(project_dir, include.replace('\\', '/')))
+                references.add(path)
+        except (ET.ParseError, OSError):
+            pass
+        return references
+
+    def owning_projects(self, file_path: str) -> List[str]:
+        """
+        Find the project(s) whose directory most closely encloses a file.
+
+        Args:
+            file_path: Changed file path
+
+        Returns:
+            Project paths (empty if the file is outside every project)
+        """
+        directory = os.path.dirname(os.path.abspath(file_path))
+        visited = []
+        owners: List[str] = []
+        while True:
+            if directory in self._owner_cache:
+                owners = self._owner_cache[directory]
+                break
+            visited.append(directory)
+            if directory in self.projects_by_dir:
+                owners = self.projects_by_dir[directory]
+                break
+            parent = os.path.dirname(directory)
+            if parent == directory or not directory.startswith(self.root_dir):
+                break
+            directory = parent
+
+        for path in visited:
+            self._owner_cache[path] = owners
+        return owners
+
+    def _closure(self, start: Iterable[str], graph: Dict[str, Set[str]]) -> Set[str]:
+        """Return everything reachable from start in graph, including start."""
+        seen = set()
+        stack = list(start)
+        while stack:
+            project = stack.pop()
+            if project in seen:
+                continue
+            seen.add(project)
+            stack.extend(graph.get(project, ()))
+        return seen
+
+    def plan(self, changed_files: Iterable[str]) -> BuildPlan:
+        """
+        Compute the projects to build for a set of changed files.
+
+        Args:
+            changed_files: Source, test or project files that changed
+
+        Returns:
+            BuildPlan with affected projects, build targets and unowned files
+        """
+        owners = set()
+        unowned = []
+        for file_path in changed_files:
+            if file_path.endswith('.csproj') and os.path.abspath(file_path) in self.references:
+                owners.add(os.path.abspath(file_path))
+                continue
+            projects = self.owning_projects(file_path)
+            if projects:
+                owners.update(projects)
+            else:
+                unowned.append(file_path)
+
+        affected = self._closure(owners, self.dependents)
+
+        # Skip projects another affected project already builds as a reference
+        covered = set()
+        for project in affected:
+            covered |= self._closure(self.references.get(project, ()), self.references)
+        targets = sorted(affected - covered)
+
+        return BuildPlan(affected=sorted(affected), targets=targets, unowned=sorted(unowned))
+
+    def build_commands(self, plan: BuildPlan, configuration: Optional[str] = None) -> List[List[str]]:
+        """
+        Return the dotnet build commands for a plan.
+
+        Args:
+            plan: Plan returned by plan()
+            configuration: Optional build configuration (e.g. 'Release')
+
+        Returns:
+            One command per build target
+        """
+        commands = []
+        for project in plan.targets:
+            command = [self.dotnet, 'build', project, '--nologo']
+            if configuration:
+                command += ['--configuration', configuration]
+            commands.append(command)
+        return commands
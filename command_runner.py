@@ -0,0 +1,135 @@
+"""
+Command Runner
+
+Runs a subprocess while streaming its output instead of buffering it.
+
+Each stdout/stderr line is written to an optional log file as soon as it
+arrives, and each stdout line is passed to line handlers (incremental
+parsers such as MatchCounter). Results are parsed from stdout only, so a
+tool that echoes its summary to stderr is not counted twice. Only the last `tail_lines` lines of each stream are kept in
+memory, so verbose builds do not grow the orchestrator's memory.
+
+Usage:
+    failures = MatchCounter(r'Failed!\\s*-\\s*Failed:\\s*(\\d+)')
+    with open('build.log', 'w') as log:
+        exit_code, stdout_tail, stderr_tail = run_streaming(
+            ['dotnet', 'test'], cwd='.', log=log, line_handlers=[failures]
+        )
+    print(failures.total)
+"""
+
+import re
+import subprocess
+import threading
+from collections import deque
+from typing import Callable, Iterable, List, Optional, Pattern, TextIO, Tuple, Union
+
+# Lines of each stream kept in memory and returned to the caller
+TAIL_LINES = 2000
+
+# Prefix marking stderr lines in the combined log
+STDERR_PREFIX = '[stderr] '
+
+LineHandler = Callable[[str], None]
+
+
+class MatchCounter:
+    """Line handler that sums an integer capture group across matching lines."""
+
+    def __init__(self, pattern: Union[str, Pattern], on_match: Optional[LineHandler] = None):
+        """
+        Args:
+            pattern: Regex whose first group is the number to add
+            on_match: Called with each matching line (e.g. to log it)
+        """
+        self.pattern = re.compile(pattern) if isinstance(pattern, str) else pattern
+        self.on_match = on_match
+        self.total = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, line: str):
+        matches = [int(m.group(1)) for m in self.pattern.finditer(line)]
+        if not matches:
+            return
+        with self._lock:
+            self.total += sum(matches)
+        if self.on_match is not None:
+            self.on_match(line.rstrip('\n'))
+
+
+def run_streaming(
+    command: List[str],
+    cwd: str,
+    timeout: Optional[float] = 600,
+    log: Optional[TextIO] = None,
+    line_handlers: Iterable[LineHandler] = (),
+    tail_lines: int = TAIL_LINES,
+) -> Tuple[int, str, str]:
+    """
+    Run a command, streaming its output to a log and to line handlers.
+
+    Args:
+        command: Command to run as list
+        cwd: Working directory
+        timeout: Timeout in seconds (None for no limit)
+        log: Open text file receiving every line; stderr lines are prefixed
+            with STDERR_PREFIX
+        line_handlers: Callables invoked with every stdout line
+        tail_lines: Number of trailing lines of each stream to return
+
+    Returns:
+        Tuple of (exit_code, stdout_tail, stderr_tail)
+
+    Raises:
+        FileNotFoundError: If the executable does not exist
+        subprocess.TimeoutExpired: If the command ran too long (it is killed)
+    """
+    handlers = list(line_handlers)
+    log_lock = threading.Lock()
+    tails = {'stdout': deque(maxlen=tail_lines), 'stderr': deque(maxlen=tail_lines)}
+
+    process = subprocess.Popen(
+        command,
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        errors='replace',
+        bufsize=1,
+    )
+
+    def pump(stream: TextIO, name: str, prefix: str, stream_handlers: List[LineHandler]):
+        tail = tails[name]
+        for line in stream:
+            tail.append(line)
+            if log is not None:
+                with log_lock:
+                    log.write(prefix + line)
+            for handler in stream_handlers:
+                handler(line)
+        stream.close()
+
+    readers = [
+        threading.Thread(target=pump, args=(process.stdout, 'stdout', '', handlers), daemon=True),
+        threading.Thread(target=pump, args=(process.stderr, 'stderr', STDERR_PREFIX, []), daemon=True),
+    ]
+    for reader in readers:
+        reader.start()
+
+    # Grandchildren of a killed command may hold the pipes open; don't wait on them forever
+    join_timeout = None
+    try:
+        exit_code = process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+        join_timeout = 5
+        raise
+    finally:
+        for reader in readers:
+            reader.join(join_timeout)
+        if log is not None:
+            with log_lock:
+                log.flush()
+
+    return exit_code, ''.join(tails['stdout']), ''.join(tails['stderr'])
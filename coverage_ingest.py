@@ -0,0 +1,193 @@
+"""
+Coverage Ingest
+
+Reads machine-readable coverage reports into per-file and per-class line
+and branch coverage.
+
+Cobertura XML (as written by coverlet or ReportGenerator's `Cobertura`
+report type) is streamed with iterparse and each element is discarded once
+counted, so memory depends on the number of classes rather than the size of
+the report. ReportGenerator's `JsonSummary` (Summary.json) is read as a
+fallback; it has per-class but no per-file figures.
+
+Usage:
+    report = load_coverage_report('./cloned_repos/abp/framework/CoverageReport')
+    print(report.overall.line_coverage, report.overall.branch_coverage)
+    print(report.stats_for_files(['./src/Clock.cs']).line_coverage)
+"""
+
+import json
+import os
+import re
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+# Report file names written by ReportGenerator, in order of preference
+COBERTURA_REPORT = 'Cobertura.xml'
+JSON_SUMMARY_REPORT = 'Summary.json'
+
+CONDITION_COVERAGE = re.compile(r'\((\d+)/(\d+)\)')
+
+
+@dataclass
+class CoverageStats:
+    """Covered and coverable line and branch counts."""
+
+    lines_covered: int = 0
+    lines_valid: int = 0
+    branches_covered: int = 0
+    branches_valid: int = 0
+
+    def add(self, other: 'CoverageStats'):
+        self.lines_covered += other.lines_covered
+        self.lines_valid += other.lines_valid
+        self.branches_covered += other.branches_covered
+        self.branches_valid += other.branches_valid
+
+    @property
+    def line_coverage(self) -> Optional[float]:
+        """Line coverage percentage, or None if there are no coverable lines."""
+        return _percent(self.lines_covered, self.lines_valid)
+
+    @property
+    def branch_coverage(self) -> Optional[float]:
+        """Branch coverage percentage, or None if there are no branches."""
+        return _percent(self.branches_covered, self.branches_valid)
+
+
+@dataclass
+class CoverageReport:
+    """Overall, per-file and per-class coverage from one report."""
+
+    source: str = ''
+    overall: CoverageStats = field(default_factory=CoverageStats)
+    files: Dict[str, CoverageStats] = field(default_factory=dict)
+    classes: Dict[str, CoverageStats] = field(default_factory=dict)
+    # Source file of each class (not available from JSON summaries)
+    class_files: Dict[str, str] = field(default_factory=dict)
+
+    def stats_for_files(self, paths: Iterable[str]) -> CoverageStats:
+        """Return the combined coverage of the given source files."""
+        total = CoverageStats()
+        for path in {_normalize(p) for p in paths}:
+            stats = self.files.get(path)
+            if stats is not None:
+                total.add(stats)
+        return total
+
+    def classes_in_files(self, paths: Iterable[str]) -> List[str]:
+        """Return the classes declared in the given source files."""
+        wanted = {_normalize(p) for p in paths}
+        return sorted(name for name, path in self.class_files.items() if path in wanted)
+
+
+def _percent(covered: int, valid: int) -> Optional[float]:
+    return round(100.0 * covered / valid, 2) if valid else None
+
+
+def _normalize(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path.replace('\\', '/')))
+
+
+def read_cobertura(path: str) -> CoverageReport:
+    """
+    Stream a Cobertura XML report.
+
+    Only <line> elements directly under a <class> are counted; the copies
+    nested under <methods> would count lines twice.
+
+    Args:
+        path: Cobertura XML file
+
+    Returns:
+        CoverageReport with overall, per-file and per-class coverage
+    """
+    report = CoverageReport(source=path)
+    sources: List[str] = []
+    stack: List[str] = []
+    current: List[CoverageStats] = []
+
+    for event, element in ET.iterparse(path, events=('start', 'end')):
+        tag = element.tag
+        if event == 'start':
+            stack.append(tag)
+            if tag == 'class':
+                name = element.get('name', '')
+                filename = element.get('filename', '')
+                if sources and not os.path.isabs(filename):
+                    filename = os.path.join(sources[0], filename)
+                filename = _normalize(filename)
+                report.class_files.setdefault(name, filename)
+                current = [
+                    report.files.setdefault(filename, CoverageStats()),
+                    report.classes.setdefault(name, CoverageStats()),
+                    report.overall,
+                ]
+            continue
+
+        stack.pop()
+        if tag == 'line' and current and stack[-2:] == ['class', 'lines']:
+            line = CoverageStats(lines_valid=1, lines_covered=int(int(element.get('hits', '0')) > 0))
+            if element.get('branch') == 'true':
+                match = CONDITION_COVERAGE.search(element.get('condition-coverage', ''))
+                if match:
+                    line.branches_covered, line.branches_valid = int(match.group(1)), int(match.group(2))
+            for stats in current:
+                stats.add(line)
+        elif tag == 'source':
+            sources.append((element.text or '').strip())
+        elif tag == 'class':
+            current = []
+            element.clear()
+        elif tag == 'package':
+            element.clear()
+
+    return report
+
+
+def read_json_summary(path: str) -> CoverageReport:
+    """
+    Read a ReportGenerator JsonSummary report.
+
+    Args:
+        path: Summary.json file
+
+    Returns:
+        CoverageReport with overall and per-class coverage
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    def stats(entry: dict) -> CoverageStats:
+        return CoverageStats(
+            lines_covered=entry.get('coveredlines') or 0,
+            lines_valid=entry.get('coverablelines') or 0,
+            branches_covered=entry.get('coveredbranches') or 0,
+            branches_valid=entry.get('totalbranches') or 0,
+        )
+
+    report = CoverageReport(source=path, overall=stats(data.get('summary', {})))
+    for assembly in data.get('coverage', {}).get('assemblies', []):
+        for entry in assembly.get('classesinassembly', []):
+            report.classes.setdefault(entry.get('name', ''), CoverageStats()).add(stats(entry))
+    return report
+
+
+def load_coverage_report(report_dir: str) -> Optional[CoverageReport]:
+    """
+    Load the most detailed machine-readable report in a ReportGenerator directory.
+
+    Args:
+        report_dir: Directory containing the generated reports
+
+    Returns:
+        CoverageReport, or None if neither report type is present
+    """
+    cobertura = os.path.join(report_dir, COBERTURA_REPORT)
+    if os.path.exists(cobertura):
+        return read_cobertura(cobertura)
+    summary = os.path.join(report_dir, JSON_SUMMARY_REPORT)
+    if os.path.exists(summary):
+        return read_json_summary(summary)
+    return None
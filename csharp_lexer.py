@@ -0,0 +1,334 @@
+"""
+C# Lexer
+
+Lightweight single-pass lexing of C# source for the static call scanner.
+
+mask_code blanks out everything that is not code: comments (including XML
+doc comments), preprocessor directives, and string, verbatim, raw and
+character literals. Each masked character becomes a space and newlines are
+kept, so offsets and line numbers in the masked text are the same as in
+the original. Interpolation holes (`$"{DateTime.Now:t}"`) are real code and
+stay visible, with their own nested literals masked (raw interpolated
+strings are masked whole). Braces inside literals
+disappear, so they no longer confuse scope tracking.
+
+type_declaration and member_declaration recognise real type and member
+declarations in a header (the code between the previous '{', '}' or ';'
+and the '{' or '=>' that opens a body), so control statements such as
+`if (...)` and calls such as `Foo(...)` are not mistaken for methods.
+source_namespace finds the namespace a file declares, to_identifier
+turns arbitrary text such as a file name into a valid identifier, and
+is_identifier checks names that must already be one.
+
+Usage:
+    code = mask_code(source)
+    # code has the same length as source; scan it instead of the source
+    member_declaration('public static int Parse(string text,\\n int radix)')
+    # ('Parse', 'string text, int radix', True)
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+# Start of any comment, directive or literal
+LITERAL_START = re.compile(r'//|/\*|[$@]+"|"|\'|#')
+
+# Whole comments and plain literals in one match, so the common cases never
+# reach Python. Interpolated strings, raw strings and directives only match
+# their opening token and are finished by _literal_end. Every branch starts
+# with a literal character so the regex engine can skip ahead to candidates.
+LITERAL = re.compile(
+    r'//[^\n]*'
+    r'|/\*[\s\S]*?(?:\*/|\Z)'
+    r'|\$[$@]*"'
+    r'|@\$[$@]*"'
+    r'|@"(?:[^"]|"")*"?'
+    r'|"""'
+    r'|"(?:[^"\\\n]|\\.)*"?'
+    r"|'(?:[^'\\\n]|\\.)*'?"
+    r'|#'
+)
+
+# Tokens that matter inside an interpolation hole
+HOLE_TOKEN = re.compile(r'[{}]|//|/\*|[$@]+"|"|\'')
+
+# Literal bodies, matched from just after the opening quote
+STRING_BODY = re.compile(r'(?:[^"\\\n]|\\.)*"?')
+VERBATIM_BODY = re.compile(r'(?:[^"]|"")*"?')
+CHAR_LITERAL = re.compile(r"'(?:[^'\\\n]|\\.)*'?")
+
+# Characters that end a run of plain text inside an interpolated string
+INTERPOLATED_SPECIAL = re.compile(r'["{\\\n]')
+VERBATIM_INTERPOLATED_SPECIAL = re.compile(r'["{]')
+
+# Declarations, matched against masked headers
+ATTRIBUTE_SECTION = re.compile(r'\[[^\[\]]*(?:\[[^\[\]]*\][^\[\]]*)*\]')
+NAMESPACE_DECLARATION = re.compile(r'\bnamespace\s+(?P<name>[A-Za-z_][\w.]*)')
+TYPE_DECLARATION = re.compile(r'\b(?:class|struct|interface|record)\s+(?P<name>[A-Za-z_]\w*)')
+MEMBER_DECLARATION = re.compile(
+    r'(?<![\w.])'
+    # Modifiers and return type: identifiers (with generics, arrays,
+    # nullability and tuple type arguments) or tuple types, each followed
+    # by whitespace
+    r'(?P<prefix>(?:\([^()]*\)\??\s*|[A-Za-z_][\w<>\[\],.?()]*\s+)+)'
+    r'(?P<name>[A-Za-z_]\w*)\s*(?:<[^()]*>)?\s*'
+    r'\((?P<params>[^()]*(?:\([^()]*\)[^()]*)*)\)'
+)
+CONSTRUCTOR_DECLARATION = re.compile(
+    r'^\s*(?P<name>[A-Za-z_]\w*)\s*\((?P<params>[^()]*(?:\([^()]*\)[^()]*)*)\)'
+)
+STATIC_MODIFIER = re.compile(r'\bstatic\b')
+NON_IDENTIFIER_CHARS = re.compile(r'[^A-Za-z0-9_]')
+IDENTIFIER = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+
+# Identifiers followed by '(' that never name a member declaration
+NON_MEMBER_KEYWORDS = frozenset({
+    'base', 'catch', 'checked', 'default', 'fixed', 'for', 'foreach', 'if', 'lock',
+    'nameof', 'new', 'return', 'sizeof', 'switch', 'this', 'typeof', 'unchecked',
+    'using', 'when', 'while',
+})
+
+# Words that can directly precede a call but never a declared member's name
+# (`new Foo(x)`, `return Bar(x)`), unlike modifiers and return types
+EXPRESSION_KEYWORDS = frozenset({
+    'as', 'await', 'case', 'else', 'goto', 'in', 'is', 'new', 'return', 'throw', 'yield',
+})
+
+# Character spans (start, end) of code inside a literal
+Holes = List[Tuple[int, int]]
+
+
+def _blank(text: str) -> str:
+    """Replace every character except newlines with a space."""
+    if '\n' not in text:
+        return ' ' * len(text)
+    return '\n'.join(' ' * len(line) for line in text.split('\n'))
+
+
+def _interpolated_end(content: str, index: int, verbatim: bool) -> Tuple[int, Holes]:
+    """
+    Find the end of an interpolated string body and the code holes inside it.
+
+    Args:
+        content: Source text
+        index: Offset just after the opening quote
+        verbatim: Whether the string is also verbatim (`$@"..."`)
+
+    Returns:
+        (end offset, holes)
+    """
+    special = VERBATIM_INTERPOLATED_SPECIAL if verbatim else INTERPOLATED_SPECIAL
+    holes: Holes = []
+    length = len(content)
+    while True:
+        m = special.search(content, index)
+        if m is None:
+            return length, holes
+        index = m.start()
+        char = m.group()
+        if char == '"':
+            if verbatim and content.startswith('""', index):
+                index += 2
+                continue
+            return index + 1, holes
+        if char == '\\':
+            index += 2
+            continue
+        if char == '\n':
+            # Unterminated regular string: stop at the end of the line
+            return index, holes
+        if content.startswith('{{', index):
+            index += 2
+            continue
+
+        hole_start = index + 1
+        depth = 1
+        index = hole_start
+        while depth:
+            token = HOLE_TOKEN.search(content, index)
+            if token is None:
+                holes.append((hole_start, length))
+                return length, holes
+            index = token.end()
+            if token.group() == '{':
+                depth += 1
+            elif token.group() == '}':
+                depth -= 1
+            else:
+                index, _ = _literal_end(content, token)
+        holes.append((hole_start, index - 1))
+
+
+def _literal_end(content: str, token: re.Match) -> Tuple[int, Holes]:
+    """
+    Find the end of the comment or literal starting at a LITERAL_START match.
+
+    Returns:
+        (end offset, code holes inside the literal)
+    """
+    start = token.start()
+    text = token.group()
+    length = len(content)
+
+    if text == '//':
+        end = content.find('\n', start)
+        return (length if end == -1 else end), []
+    if text == '/*':
+        end = content.find('*/', start + 2)
+        return (length if end == -1 else end + 2), []
+    if text == "'":
+        return CHAR_LITERAL.match(content, start).end(), []
+
+    quote = token.end() - 1
+    if content.startswith('"""', quote):
+        # Raw string literal: closed by as many quotes as opened it
+        quotes = len(content[quote:]) - len(content[quote:].lstrip('"'))
+        end = content.find('"' * quotes, quote + quotes)
+        return (length if end == -1 else end + quotes), []
+
+    verbatim = '@' in text
+    if '$' in text:
+        return _interpolated_end(content, quote + 1, verbatim)
+    body = VERBATIM_BODY if verbatim else STRING_BODY
+    return body.match(content, quote + 1).end(), []
+
+
+def mask_code(content: str) -> str:
+    """
+    Blank out comments, directives and literals, keeping offsets unchanged.
+
+    Args:
+        content: C# source text
+
+    Returns:
+        Text of the same length in which only code (including interpolation
+        holes) is left; everything else is spaces, except newlines
+    """
+    pieces = []
+    pos = 0
+    length = len(content)
+    while pos < length:
+        token = LITERAL.search(content, pos)
+        if token is None:
+            break
+        start = token.start()
+        end, holes = token.end(), ()
+        text = token.group()
+        if text == '#':
+            # Only a directive when it is the first thing on its line
+            line_start = content.rfind('\n', 0, start) + 1
+            if content[line_start:start].strip():
+                pieces.append(content[pos:end])
+                pos = end
+                continue
+            end = content.find('\n', start)
+            if end == -1:
+                end = length
+        elif text == '"""' or text[0] == '$' or text.startswith('@$'):
+            end, holes = _literal_end(content, LITERAL_START.match(content, start))
+
+        pieces.append(content[pos:start])
+        cursor = start
+        for hole_start, hole_end in holes:
+            pieces.append(_blank(content[cursor:hole_start]))
+            pieces.append(mask_code(content[hole_start:hole_end]))
+            cursor = hole_end
+        pieces.append(_blank(content[cursor:end]))
+        pos = end
+
+    if not pieces:
+        return content
+    pieces.append(content[pos:])
+    return ''.join(pieces)
+
+
+def source_namespace(code: str) -> Optional[str]:
+    """
+    Return the first namespace declared in masked code.
+
+    Both block (`namespace A.B { }`) and file-scoped (`namespace A.B;`)
+    declarations are recognised.
+
+    Args:
+        code: Masked C# source
+
+    Returns:
+        Dotted namespace name, or None if the code declares none
+    """
+    m = NAMESPACE_DECLARATION.search(code)
+    return m.group('name') if m else None
+
+
+def to_identifier(text: str) -> str:
+    """
+    Reduce text to a C# identifier.
+
+    Every character outside [A-Za-z0-9_] becomes '_', and a leading digit
+    (or empty text) gets a '_' prefix, e.g. 'Initial.Designer' ->
+    'Initial_Designer' and '20240101-Init' -> '_20240101_Init'.
+
+    Args:
+        text: Any text, such as a file name stem
+
+    Returns:
+        Valid identifier
+    """
+    name = NON_IDENTIFIER_CHARS.sub('_', text)
+    if not name or name[0].isdigit():
+        name = '_' + name
+    return name
+
+
+def is_identifier(text: str) -> bool:
+    """Whether text is a plain C# identifier ([A-Za-z_][A-Za-z0-9_]*)."""
+    return IDENTIFIER.fullmatch(text) is not None
+
+
+def type_declaration(header: str) -> Optional[str]:
+    """
+    Return the name of the class, struct, interface or record a header declares.
+
+    Args:
+        header: Masked code preceding a '{'
+
+    Returns:
+        Type name, or None if the header does not declare a type
+    """
+    m = TYPE_DECLARATION.search(header)
+    return m.group('name') if m else None
+
+
+def member_declaration(header: str, class_name: Optional[str] = None) -> Optional[Tuple[str, str, bool]]:
+    """
+    Recognise a method or constructor declaration in a header.
+
+    A declaration needs modifiers or a return type before its name, so
+    calls (`Foo(x)`, `new Foo(x)`, `return Foo(x)`), control statements and
+    initializers (`= new Foo(x)`) are rejected. Constructors without modifiers are recognised by the
+    enclosing class name.
+
+    Args:
+        header: Masked code preceding a '{' or '=>'
+        class_name: Name of the enclosing type, if known
+
+    Returns:
+        (name, parameters, is_static), or None if the header declares no method
+    """
+    if '(' not in header:
+        return None
+    header = ATTRIBUTE_SECTION.sub(' ', header)
+
+    m = MEMBER_DECLARATION.search(header)
+    if (
+        m
+        and m.group('name') not in NON_MEMBER_KEYWORDS
+        and m.group('prefix').split()[-1] not in EXPRESSION_KEYWORDS
+        and '=' not in header[:m.start('name')]
+    ):
+        is_static = STATIC_MODIFIER.search(m.group('prefix')) is not None
+        return m.group('name'), ' '.join(m.group('params').split()), is_static
+
+    m = CONSTRUCTOR_DECLARATION.match(header)
+    if m and class_name and m.group('name') == class_name:
+        return m.group('name'), ' '.join(m.group('params').split()), False
+    return None
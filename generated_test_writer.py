@@ -0,0 +1,220 @@
+"""
+Generated Test Writer
+
+Content-hash-aware writer for the GeneratedTests directory.
+
+Rewriting byte-identical test files bumps their mtimes and forces MSBuild to
+recompile the generated test project on every run. This writer compares the
+SHA-256 of each new test with what is already on disk and only writes files
+whose content changed. Writes are atomic (temp file + rename) and run on a
+thread pool.
+
+A JSON manifest records the hash, size, mtime and source file of every test
+written. It lets unchanged files be confirmed without re-reading them, and
+lets tests whose source method no longer exists be removed.
+
+Usage:
+    with GeneratedTestWriter('./GeneratedTests', './test_logs/manifest.json') as writer:
+        writer.write(test_path, content, source_file)
+    print(writer.stats)   # {'written': .., 'unchanged': .., 'removed': .., 'failed': ..}
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class GeneratedTestWriter:
+    """Writes generated test files only when their content changes."""
+
+    def __init__(
+        self,
+        output_dir: str,
+        manifest_path: str,
+        workers: int = 8,
+        logger: Optional[logging.Logger] = None,
+    ):
+        """
+        Initialize the writer.
+
+        Args:
+            output_dir: Directory the generated tests are written to
+            manifest_path: JSON file recording what was written on previous runs
+            workers: Threads used for hashing and writing
+            logger: Logger for errors (defaults to this module's logger)
+        """
+        self.output_dir = output_dir
+        self.manifest_path = manifest_path
+        self.logger = logger or logging.getLogger(__name__)
+        self.stats = {'written': 0, 'unchanged': 0, 'removed': 0, 'failed': 0}
+        # Paths of tests written or removed this run (inputs to the build planner)
+        self.changed_paths: List[str] = []
+
+        self._previous = self._load_manifest()
+        self._manifest: Dict[str, dict] = {}
+        self._pending: Dict[str, Future] = {}
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='test-writer')
+        self._closed = False
+
+    def __enter__(self) -> 'GeneratedTestWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Never remove tests after a failed generation pass
+        self.close(remove_stale=exc_type is None)
+
+    def _load_manifest(self) -> Dict[str, dict]:
+        """Load the manifest from the previous run, or an empty one."""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def write(self, test_path: str, content: str, source_file: str):
+        """
+        Queue a test file to be written if its content changed.
+
+        Args:
+            test_path: Destination path inside output_dir
+            content: Full test file content
+            source_file: Source file the test was generated from
+        """
+        data = content.encode('utf-8')
+        name = os.path.relpath(test_path, self.output_dir)
+
+        # Keep writes to the same path in submission order
+        previous = self._pending.get(name)
+        if previous is not None:
+            self._collect(name, previous)
+
+        self._pending[name] = self._pool.submit(self._write_file, test_path, name, data, source_file)
+
+    def _write_file(self, test_path: str, name: str, data: bytes, source_file: str) -> Tuple[str, dict]:
+        """Compare and (if needed) atomically write one file. Runs on the thread pool."""
+        digest = hashlib.sha256(data).hexdigest()
+        entry = self._previous.get(name)
+
+        try:
+            stat = os.stat(test_path)
+        except FileNotFoundError:
+            stat = None
+
+        if stat is not None and stat.st_size == len(data):
+            # The manifest vouches for files untouched since we wrote them
+            if entry and entry['sha256'] == digest and entry['mtime_ns'] == stat.st_mtime_ns:
+                return 'unchanged', self._entry(digest, stat, source_file)
+            with open(test_path, 'rb') as f:
+                if hashlib.sha256(f.read()).digest() == bytes.fromhex(digest):
+                    return 'unchanged', self._entry(digest, stat, source_file)
+
+        directory = os.path.dirname(test_path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.cs.part')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            # mkstemp creates owner-only files; keep the usual permissions
+            os.chmod(tmp_path, stat.st_mode & 0o777 if stat is not None else 0o644)
+            os.replace(tmp_path, test_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        return 'written', self._entry(digest, os.stat(test_path), source_file)
+
+    @staticmethod
+    def _entry(digest: str, stat: os.stat_result, source_file: str) -> dict:
+        return {
+            'sha256': digest,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'source': source_file,
+        }
+
+    def _collect(self, name: str, future: Future):
+        """Wait for one queued write and record its outcome."""
+        try:
+            outcome, entry = future.result()
+        except Exception as e:
+            self.logger.error(f"Error writing generated test {name}: {e}")
+            self.stats['failed'] += 1
+            return
+        self.stats[outcome] += 1
+        self._manifest[name] = entry
+        if outcome == 'written':
+            self.changed_paths.append(os.path.join(self.output_dir, name))
+
+    def close(
+        self,
+        remove_stale: bool = True,
+        scanned_sources: Optional[Iterable[str]] = None,
+    ) -> Dict[str, int]:
+        """
+        Finish all writes, remove stale tests and save the manifest.
+
+        A previously generated test is stale when it was not emitted this run
+        and its source file either no longer exists or was re-scanned this run.
+        Only files recorded in the manifest are ever removed; hand-written or
+        pre-existing files in output_dir are left alone.
+
+        Args:
+            remove_stale: Delete stale tests
+            scanned_sources: Source files analyzed this run (None means
+                every source was analyzed)
+
+        Returns:
+            Counts of written, unchanged, removed and failed files
+        """
+        if self._closed:
+            return self.stats
+        self._closed = True
+
+        for name, future in self._pending.items():
+            self._collect(name, future)
+        self._pool.shutdown(wait=True)
+
+        if remove_stale:
+            self._remove_stale(None if scanned_sources is None else set(scanned_sources))
+        else:
+            # Keep tracking earlier tests that are still on disk
+            for name, entry in self._previous.items():
+                self._manifest.setdefault(name, entry)
+
+        manifest_dir = os.path.dirname(self.manifest_path)
+        if manifest_dir:
+            os.makedirs(manifest_dir, exist_ok=True)
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+        return self.stats
+
+    def _remove_stale(self, scanned_sources: Optional[set]):
+        """Delete tests whose source method no longer produces them."""
+        stale = []
+        for name, entry in self._previous.items():
+            if name in self._pending:
+                continue
+            source = entry.get('source', '')
+            if scanned_sources is None or source in scanned_sources or not os.path.exists(source):
+                stale.append(name)
+            else:
+                # Source was not rescanned this run; keep its tests
+                self._manifest[name] = entry
+
+        for name in stale:
+            try:
+                os.remove(os.path.join(self.output_dir, name))
+                self.stats['removed'] += 1
+                self.changed_paths.append(os.path.join(self.output_dir, name))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                self.logger.error(f"Error removing stale test {name}: {e}")
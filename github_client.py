@@ -0,0 +1,349 @@
+"""
+GitHub Client
+
+Concurrent, rate-limit aware access to the GitHub REST API for orchestrator.py.
+
+Requests go through one pooled requests.Session on a small thread pool and
+are driven from asyncio, with at most `concurrency` in flight. Instead of
+sleeping a fixed time between requests, every rate limit resource (core,
+search, code_search) has a token bucket that is refilled from the
+responses themselves: X-RateLimit-Remaining is the number of tokens left and
+X-RateLimit-Reset the time the bucket refills (converted to the local clock
+with the response's Date header, so clock skew does not matter). Requests
+go out back to back while tokens remain and wait for the reset once they
+run out, so a run proceeds at the API's actual limit. A rate limited
+response (403 or 429) is retried after its Retry-After, after the reset if
+the remaining count is 0, or after SECONDARY_LIMIT_SECONDS otherwise.
+
+With a ResponseCache (http_cache.py), responses are kept on disk and served
+without a request while younger than the cache's TTL; older ones are
+revalidated with If-None-Match / If-Modified-Since, and a 304 costs no
+primary rate limit quota.
+
+base_url points the client at any server speaking the same headers, such as
+a local stub that simulates rate limits.
+
+Usage:
+    async with GitHubClient(token, concurrency=4) as client:
+        response = await client.search_repositories('language:C# stars:>10000')
+        counts = await asyncio.gather(*(
+            client.search_code(f'DateTime.Now repo:{repo}') for repo in repos
+        ))
+    print(client.stats)
+"""
+
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Mapping, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from http_cache import CachedResponse, ResponseCache
+
+DEFAULT_API_URL = 'https://api.github.com'
+DEFAULT_CONCURRENCY = 4
+MAX_RETRIES = 3
+REQUEST_TIMEOUT = 30
+
+# Wait after a rate limited response that says neither when to retry nor
+# that the primary limit is exhausted (GitHub's secondary rate limits)
+SECONDARY_LIMIT_SECONDS = 60.0
+
+# Added to every reset time, which GitHub reports in whole seconds
+RESET_MARGIN_SECONDS = 1.0
+
+ACCEPT = 'application/vnd.github+json'
+USER_AGENT = 'mocking-static-methods-orchestrator'
+
+
+@dataclass
+class GitHubResponse:
+    """Status, headers (case-insensitive) and body of one API response."""
+
+    status: int
+    headers: Mapping[str, str]
+    text: str
+    url: str
+    # Still rate limited after every retry was used
+    rate_limited: bool = False
+    # Served from the response cache (fresh, or revalidated with a 304)
+    cached: bool = False
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+
+def rate_limit_resource(path: str) -> str:
+    """Name of the GitHub rate limit resource a request path counts against."""
+    if path.startswith('/search/code'):
+        return 'code_search'
+    if path.startswith('/search/'):
+        return 'search'
+    return 'core'
+
+
+def is_rate_limited(status: int, headers: Mapping[str, str], text: str) -> bool:
+    """Whether a response was refused for exceeding a rate limit (not for lack of permission)."""
+    if status == 429:
+        return True
+    return status == 403 and (
+        'Retry-After' in headers
+        or headers.get('X-RateLimit-Remaining') == '0'
+        or 'rate limit' in text.lower()
+    )
+
+
+class RateLimitBucket:
+    """Request allowance of one rate limit resource, as last reported by the server."""
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        """
+        Args:
+            clock: Current time in seconds (time.time; replaceable in tests)
+        """
+        self.clock = clock
+        self.limit: Optional[int] = None
+        # None until the first response reports it
+        self.remaining: Optional[int] = None
+        # Server's reset timestamp (identifies the window) and its local time
+        self.window: Optional[float] = None
+        self.reset_at = 0.0
+        self.blocked_until = 0.0
+
+    def take(self) -> float:
+        """
+        Take a token if one is available.
+
+        Returns:
+            0 if a token was taken, otherwise the seconds to wait before
+            trying again
+        """
+        now = self.clock()
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.window is not None and now >= self.reset_at:
+            # The window has rolled over; the server refills it to the limit
+            self.remaining = self.limit
+            self.window = None
+        if self.remaining is None:
+            return 0.0
+        if self.remaining > 0:
+            self.remaining -= 1
+            return 0.0
+        if self.window is None:
+            # Refill used up before any response reported the new window
+            return 0.0
+        return self.reset_at - now
+
+    def update(self, headers: Mapping[str, str]):
+        """Refresh the allowance from a response's X-RateLimit headers."""
+        remaining = headers.get('X-RateLimit-Remaining')
+        reset = headers.get('X-RateLimit-Reset')
+        if remaining is None or reset is None:
+            return
+        try:
+            remaining, window = int(remaining), float(reset)
+        except ValueError:
+            return
+        if self.window is not None and window < self.window:
+            return  # Response from a window that has already ended
+
+        if self.window is None or window > self.window or self.remaining is None:
+            self.remaining = remaining
+        else:
+            # Responses arrive out of order; the lowest count is the latest
+            self.remaining = min(self.remaining, remaining)
+        self.window = window
+        limit = headers.get('X-RateLimit-Limit')
+        if limit and limit.isdigit():
+            self.limit = int(limit)
+        self.reset_at = self.clock() + window - server_time(headers, self.clock) + RESET_MARGIN_SECONDS
+
+    def refund(self):
+        """Give back the token of a request the server did not count."""
+        if self.remaining is not None and (self.limit is None or self.remaining < self.limit):
+            self.remaining += 1
+
+    def block(self, seconds: float):
+        """Send nothing for a number of seconds (Retry-After, secondary limits)."""
+        self.blocked_until = max(self.blocked_until, self.clock() + seconds)
+
+
+def server_time(headers: Mapping[str, str], clock: Callable[[], float] = time.time) -> float:
+    """Server's current time from the Date header, or the local time if it has none."""
+    date = headers.get('Date')
+    if date:
+        try:
+            return parsedate_to_datetime(date).timestamp()
+        except (TypeError, ValueError):
+            pass
+    return clock()
+
+
+def retry_after_seconds(headers: Mapping[str, str], clock: Callable[[], float] = time.time) -> Optional[float]:
+    """Seconds requested by a Retry-After header (delay or HTTP date), if any."""
+    value = headers.get('Retry-After')
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - server_time(headers, clock), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def cached_response(cached: CachedResponse) -> GitHubResponse:
+    """GitHubResponse for a response served from the cache."""
+    return GitHubResponse(cached.status, CaseInsensitiveDict(cached.headers), cached.body, cached.url, cached=True)
+
+
+class GitHubClient:
+    """asyncio GitHub REST client with bounded concurrency and header-driven rate limiting."""
+
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        base_url: str = DEFAULT_API_URL,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        max_retries: int = MAX_RETRIES,
+        timeout: float = REQUEST_TIMEOUT,
+        clock: Callable[[], float] = time.time,
+        cache: Optional[ResponseCache] = None,
+    ):
+        """
+        Args:
+            token: Personal access token (unauthenticated if None)
+            base_url: API root, e.g. a local stub server
+            concurrency: Requests in flight at once
+            max_retries: Retries of a rate limited request
+            timeout: Seconds to wait for each response
+            clock: Current time in seconds (time.time; replaceable in tests)
+            cache: Persistent response cache for GET requests (none if None);
+                the caller owns and closes it
+        """
+        self.base_url = base_url.rstrip('/')
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.clock = clock
+        self.cache = cache
+        self.buckets: Dict[str, RateLimitBucket] = {}
+        self.stats = {'requests': 0, 'rate_limited': 0, 'waits': 0, 'cached': 0, 'not_modified': 0}
+
+        self._session = requests.Session()
+        self._session.mount(base_url, HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency))
+        self._session.headers.update({'Accept': ACCEPT, 'User-Agent': USER_AGENT})
+        if token:
+            self._session.headers['Authorization'] = f'token {token}'
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='github')
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self) -> 'GitHubClient':
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Close the pooled connections and stop the request threads."""
+        self._session.close()
+        self._executor.shutdown(wait=False)
+
+    def url(self, path: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Full URL of a request, as it is sent."""
+        return requests.Request('GET', self.base_url + path, params=params).prepare().url
+
+    def bucket(self, resource: str) -> RateLimitBucket:
+        if resource not in self.buckets:
+            self.buckets[resource] = RateLimitBucket(self.clock)
+        return self.buckets[resource]
+
+    async def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> GitHubResponse:
+        """
+        GET an API path, waiting for the rate limit and retrying when limited.
+
+        With a cache, a response younger than its TTL is returned without a
+        request, and an older one is revalidated with a conditional request.
+
+        Args:
+            path: Path under base_url, e.g. '/search/code'
+            params: Query parameters
+
+        Returns:
+            The response; rate_limited is set if it was still rate limited
+            after max_retries retries
+
+        Raises:
+            requests.RequestException: If the request itself fails
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        bucket = self.bucket(rate_limit_resource(path))
+        url = self.url(path, params)
+
+        cached = self.cache.get(url) if self.cache is not None else None
+        if cached and self.cache.is_fresh(cached):
+            self.stats['cached'] += 1
+            return cached_response(cached)
+        validators = cached.validators if cached else {}
+
+        for _ in range(self.max_retries + 1):
+            raw = await self._send(bucket, url, validators)
+            headers = raw.headers
+            response = GitHubResponse(raw.status_code, headers, raw.text, raw.url)
+            bucket.update(headers)
+            if not is_rate_limited(response.status, headers, response.text):
+                if response.status == 304 and cached:
+                    # Not counted against the primary rate limit
+                    bucket.refund()
+                    self.stats['not_modified'] += 1
+                    self.cache.renew(url)
+                    return cached_response(cached)
+                if response.status == 200 and self.cache is not None:
+                    self.cache.store(url, response.status, headers, response.text)
+                return response
+
+            self.stats['rate_limited'] += 1
+            retry_after = retry_after_seconds(headers, self.clock)
+            if retry_after is not None:
+                bucket.block(retry_after)
+            elif headers.get('X-RateLimit-Remaining') != '0':
+                bucket.block(SECONDARY_LIMIT_SECONDS)
+
+        response.rate_limited = True
+        return response
+
+    async def search_repositories(
+        self, query: str, per_page: int = 100, sort: str = 'stars', order: str = 'desc',
+    ) -> GitHubResponse:
+        """Search repositories (GET /search/repositories)."""
+        return await self.get('/search/repositories', {'q': query, 'sort': sort, 'order': order, 'per_page': per_page})
+
+    async def search_code(self, query: str, per_page: int = 1) -> GitHubResponse:
+        """Search code (GET /search/code); per_page=1 is enough to read total_count."""
+        return await self.get('/search/code', {'q': query, 'per_page': per_page})
+
+    async def _send(self, bucket: RateLimitBucket, url: str, headers: Dict[str, str]) -> requests.Response:
+        # Tokens are taken while holding a request slot, so at most
+        # `concurrency` requests go out before a response reports the limit
+        loop = asyncio.get_running_loop()
+        while True:
+            async with self._semaphore:
+                wait = bucket.take()
+                if wait <= 0:
+                    self.stats['requests'] += 1
+                    return await loop.run_in_executor(
+                        self._executor,
+                        lambda: self._session.get(url, headers=headers, timeout=self.timeout),
+                    )
+            self.stats['waits'] += 1
+            await asyncio.sleep(wait)
@@ -0,0 +1,149 @@
+"""
+HTTP Cache
+
+Persistent cache of GitHub API responses, revalidated with conditional requests.
+
+Successful responses are stored in SQLite by URL along with their ETag and
+Last-Modified validators. Within the TTL a cached response is served
+without any request at all. Once it is older than the TTL, the request is
+sent with If-None-Match / If-Modified-Since; a 304 Not Modified answer
+renews the cached entry (and does not count against GitHub's primary rate
+limit), anything else replaces it.
+
+Usage:
+    with ResponseCache('github_cache.sqlite', ttl_seconds=24 * 3600) as cache:
+        async with GitHubClient(token, cache=cache) as client:
+            response = await client.search_repositories('language:C# stars:>10000')
+        print(client.stats['cached'], client.stats['not_modified'])
+"""
+
+import json
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Mapping, Optional
+
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    body TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    stored_at REAL NOT NULL
+);
+"""
+
+
+@dataclass
+class CachedResponse:
+    """A stored response and when it was last fetched or revalidated."""
+
+    url: str
+    status: int
+    headers: Dict[str, str]
+    body: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+
+    @property
+    def validators(self) -> Dict[str, str]:
+        """Request headers that make a conditional request for this response."""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """SQLite-backed store of API responses keyed by URL."""
+
+    def __init__(
+        self,
+        db_path: str,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Open (or create) the cache.
+
+        Args:
+            db_path: Path to the SQLite database file
+            ttl_seconds: Age up to which responses are served without
+                revalidation (0 revalidates every time)
+            clock: Current time in seconds (time.time; replaceable in tests)
+        """
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self) -> 'ResponseCache':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        """Return the stored response for a URL, fresh or not, if there is one."""
+        row = self.conn.execute(
+            'SELECT status, headers, body, etag, last_modified, stored_at FROM responses WHERE url = ?', (url,)
+        ).fetchone()
+        if row is None:
+            return None
+        status, headers, body, etag, last_modified, stored_at = row
+        return CachedResponse(url, status, json.loads(headers), body, etag, last_modified, stored_at)
+
+    def is_fresh(self, cached: CachedResponse) -> bool:
+        """Whether a stored response is young enough to serve without revalidation."""
+        return self.clock() - cached.stored_at < self.ttl_seconds
+
+    def store(self, url: str, status: int, headers: Mapping[str, str], body: str):
+        """
+        Insert or replace the stored response for a URL.
+
+        Args:
+            url: Full request URL, including the query string
+            status: HTTP status
+            headers: Response headers
+            body: Response body
+        """
+        headers = dict(headers)
+        # Match validators case-insensitively; the stored headers keep their case
+        lowered = {name.lower(): value for name, value in headers.items()}
+        with self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO responses (url, status, headers, body, etag, last_modified, stored_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (
+                    url, status, json.dumps(headers), body,
+                    lowered.get('etag'), lowered.get('last-modified'), self.clock(),
+                ),
+            )
+
+    def renew(self, url: str):
+        """Restart the TTL of a stored response after a 304 Not Modified."""
+        with self.conn:
+            self.conn.execute('UPDATE responses SET stored_at = ? WHERE url = ?', (self.clock(), url))
+
+    def clear(self):
+        """Drop every stored response."""
+        with self.conn:
+            self.conn.execute('DELETE FROM responses')
+
+    def close(self):
+        """Commit pending changes and close the database."""
+        self.conn.commit()
+        self.conn.close()
@@ -0,0 +1,258 @@
+"""
+Metrics Store
+
+SQLite history of orchestrator runs for trend reports.
+
+Every run gets a row in `runs`; its metrics are stored in long form keyed
+by run id: run-level values (coverage, tests generated, build status...)
+in `run_metrics`, files per static pattern in `pattern_metrics`, and
+per-phase timing and resource figures in `phase_metrics`. New metrics,
+patterns or phases need no schema change, and the (name, run_id) indexes
+keep trend queries fast after thousands of runs.
+
+Usage:
+    with MetricsStore('test_metrics.sqlite') as store:
+        run_id = store.record_run(metrics, patterns, phases)
+        for run_id, timestamp, value in store.metric_trend('final_coverage', limit=20):
+            ...
+
+    python metrics_store.py trend final_coverage --limit 20
+    python metrics_store.py phases --column wall_s
+    python metrics_store.py patterns
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+METRICS_DB = 'test_metrics.sqlite'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    project TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_project ON runs (project, run_id);
+CREATE TABLE IF NOT EXISTS run_metrics (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    value,
+    PRIMARY KEY (run_id, name)
+);
+CREATE INDEX IF NOT EXISTS run_metrics_name ON run_metrics (name, run_id);
+CREATE TABLE IF NOT EXISTS pattern_metrics (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    pattern TEXT NOT NULL,
+    files INTEGER NOT NULL,
+    PRIMARY KEY (run_id, pattern)
+);
+CREATE INDEX IF NOT EXISTS pattern_metrics_pattern ON pattern_metrics (pattern, run_id);
+CREATE TABLE IF NOT EXISTS phase_metrics (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    phase TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value,
+    PRIMARY KEY (run_id, phase, name)
+);
+CREATE INDEX IF NOT EXISTS phase_metrics_name ON phase_metrics (name, phase, run_id);
+"""
+
+# (run_id, timestamp, value)
+TrendRow = Tuple[int, str, object]
+
+
+class MetricsStore:
+    """SQLite-backed store of run, pattern and phase metrics."""
+
+    def __init__(self, db_path: str = METRICS_DB):
+        """
+        Open (or create) the store.
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute('PRAGMA foreign_keys = ON')
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self) -> 'MetricsStore':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def record_run(
+        self,
+        metrics: Dict[str, object],
+        patterns: Optional[Dict[str, int]] = None,
+        phases: Optional[Dict[str, Dict[str, object]]] = None,
+        timestamp: Optional[str] = None,
+        project: str = 'abp',
+    ) -> int:
+        """
+        Store one run.
+
+        Args:
+            metrics: Run-level metrics (numbers, strings or booleans; None is skipped)
+            patterns: Files found per static pattern
+            phases: Per-phase measurements, e.g. {'build': {'wall_s': 12.5}}
+            timestamp: ISO timestamp (defaults to now)
+            project: Project the run analyzed
+
+        Returns:
+            The new run id
+        """
+        with self.conn:
+            cursor = self.conn.execute(
+                'INSERT INTO runs (timestamp, project) VALUES (?, ?)',
+                (timestamp or datetime.now().isoformat(), project),
+            )
+            run_id = cursor.lastrowid
+            self.conn.executemany(
+                'INSERT INTO run_metrics (run_id, name, value) VALUES (?, ?, ?)',
+                ((run_id, name, value) for name, value in metrics.items() if value is not None),
+            )
+            self.conn.executemany(
+                'INSERT INTO pattern_metrics (run_id, pattern, files) VALUES (?, ?, ?)',
+                ((run_id, pattern, files) for pattern, files in (patterns or {}).items()),
+            )
+            self.conn.executemany(
+                'INSERT INTO phase_metrics (run_id, phase, name, value) VALUES (?, ?, ?, ?)',
+                (
+                    (run_id, phase, name, value)
+                    for phase, values in (phases or {}).items()
+                    for name, value in values.items()
+                    if value is not None
+                ),
+            )
+        return run_id
+
+    def runs(self, limit: Optional[int] = None, project: Optional[str] = None) -> List[Tuple[int, str, str]]:
+        """Return (run_id, timestamp, project) of the most recent runs, oldest first."""
+        query = 'SELECT run_id, timestamp, project FROM runs'
+        params: list = []
+        if project:
+            query += ' WHERE project = ?'
+            params.append(project)
+        return self._latest(query, params, limit)
+
+    def metric_trend(self, name: str, limit: Optional[int] = None) -> List[TrendRow]:
+        """Return a run-level metric across runs, oldest first."""
+        return self._latest(
+            'SELECT r.run_id, r.timestamp, m.value FROM run_metrics m '
+            'JOIN runs r ON r.run_id = m.run_id WHERE m.name = ?',
+            [name],
+            limit,
+        )
+
+    def pattern_trend(self, pattern: str, limit: Optional[int] = None) -> List[TrendRow]:
+        """Return the files found for a static pattern across runs, oldest first."""
+        return self._latest(
+            'SELECT r.run_id, r.timestamp, p.files FROM pattern_metrics p '
+            'JOIN runs r ON r.run_id = p.run_id WHERE p.pattern = ?',
+            [pattern],
+            limit,
+        )
+
+    def phase_trend(self, phase: str, name: str = 'wall_s', limit: Optional[int] = None) -> List[TrendRow]:
+        """Return one measurement of a phase across runs, oldest first."""
+        return self._latest(
+            'SELECT r.run_id, r.timestamp, p.value FROM phase_metrics p '
+            'JOIN runs r ON r.run_id = p.run_id WHERE p.name = ? AND p.phase = ?',
+            [name, phase],
+            limit,
+        )
+
+    def names(self, table: str, column: str) -> List[str]:
+        """Return the distinct metric, pattern or phase names recorded in a table."""
+        if (table, column) not in {
+            ('run_metrics', 'name'), ('pattern_metrics', 'pattern'),
+            ('phase_metrics', 'phase'), ('phase_metrics', 'name'),
+        }:
+            raise ValueError(f"Unknown metrics column: {table}.{column}")
+        return [row[0] for row in self.conn.execute(f'SELECT DISTINCT {column} FROM {table} ORDER BY {column}')]
+
+    def _latest(self, query: str, params: list, limit: Optional[int]) -> list:
+        """Run a query over runs, keeping the latest `limit` rows in ascending run order."""
+        if limit:
+            rows = self.conn.execute(f'{query} ORDER BY 1 DESC LIMIT ?', params + [limit]).fetchall()
+            return rows[::-1]
+        return self.conn.execute(f'{query} ORDER BY 1', params).fetchall()
+
+    def close(self):
+        """Commit pending changes and close the database."""
+        self.conn.commit()
+        self.conn.close()
+
+
+def _print_table(headers: List[str], rows: List[tuple]):
+    """Print rows as aligned columns."""
+    cells = [headers] + [['' if value is None else str(value) for value in row] for row in rows]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(headers))]
+    for row in cells:
+        print('  '.join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip())
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line trend reports."""
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--db', default=METRICS_DB, help=f"Metrics database (default: {METRICS_DB})")
+    common.add_argument('--limit', type=int, default=20, help="Number of most recent runs to show (default: 20)")
+
+    parser = argparse.ArgumentParser(description="Trend reports from the orchestrator metrics store")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    commands.add_parser('runs', parents=[common], help="List recent runs")
+
+    trend = commands.add_parser('trend', parents=[common], help="Show run-level metrics across runs")
+    trend.add_argument('metrics', nargs='*', default=['final_coverage', 'unit_tests_generated', 'failing_tests'],
+                       help="Metric names (default: final_coverage unit_tests_generated failing_tests)")
+
+    patterns = commands.add_parser('patterns', parents=[common], help="Show files found per static pattern across runs")
+    patterns.add_argument('patterns', nargs='*', help="Patterns to show (default: all)")
+
+    phases = commands.add_parser('phases', parents=[common], help="Show a per-phase measurement across runs")
+    phases.add_argument('--column', default='wall_s', help="Phase measurement to show (default: wall_s)")
+    phases.add_argument('phases', nargs='*', help="Phases to show (default: all)")
+
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.db):
+        print(f"Metrics database not found: {args.db}", file=sys.stderr)
+        return 1
+
+    with MetricsStore(args.db) as store:
+        if args.command == 'runs':
+            _print_table(['run_id', 'timestamp', 'project'], store.runs(args.limit))
+            return 0
+
+        if args.command == 'trend':
+            names, series = args.metrics, [store.metric_trend(name, args.limit) for name in args.metrics]
+        elif args.command == 'patterns':
+            names = args.patterns or store.names('pattern_metrics', 'pattern')
+            series = [store.pattern_trend(name, args.limit) for name in names]
+        else:
+            names = args.phases or store.names('phase_metrics', 'phase')
+            series = [store.phase_trend(name, args.column, args.limit) for name in names]
+
+        # One row per run, one column per series
+        runs = {run_id: timestamp for run_id, timestamp, _ in store.runs(args.limit)}
+        values = [{run_id: value for run_id, _, value in rows} for rows in series]
+        rows = [
+            (run_id, timestamp, *(column.get(run_id) for column in values))
+            for run_id, timestamp in runs.items()
+        ]
+        _print_table(['run_id', 'timestamp'] + names, rows)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,31 +1,65 @@
 
+import asyncio
 import os
 import subprocess
-import requests
 import json
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 
+from github_client import DEFAULT_API_URL, DEFAULT_CONCURRENCY, GitHubClient
+from http_cache import DEFAULT_TTL_SECONDS, ResponseCache
+from pattern_registry import load_registry
+
 # Load environment variables from .env file
 load_dotenv()
 
-def fetch_repos_with_static_calls(token):
+# GitHub API root (point it at a stub server to test) and requests in flight at once
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", DEFAULT_API_URL)
+GITHUB_CONCURRENCY = int(os.getenv("GITHUB_CONCURRENCY", DEFAULT_CONCURRENCY))
+
+# On-disk cache of GitHub search responses (empty path disables it) and the
+# age in seconds up to which cached responses are used without revalidation
+GITHUB_CACHE = os.getenv("GITHUB_CACHE", "github_cache.sqlite")
+GITHUB_CACHE_TTL = float(os.getenv("GITHUB_CACHE_TTL", DEFAULT_TTL_SECONDS))
+
+@asynccontextmanager
+async def open_github_client(token, concurrency=None):
+    """GitHubClient configured from the environment, with the response cache if enabled."""
+    cache = ResponseCache(GITHUB_CACHE, ttl_seconds=GITHUB_CACHE_TTL) if GITHUB_CACHE else None
+    try:
+        async with GitHubClient(token, base_url=GITHUB_API_URL, concurrency=concurrency or GITHUB_CONCURRENCY,
+                                cache=cache) as client:
+            yield client
+    finally:
+        if cache is not None:
+            cache.close()
+
+# Patterns shared with test_orchestrator.py and the StaticCallAnalyzer
+PATTERN_REGISTRY = load_registry()
+
+def fetch_repos_with_static_calls(token, concurrency=None):
     """Fetch popular C# repos and count static method call usage in each."""
-    headers = {"Authorization": f"token {token}"}
-    
+    return asyncio.run(_fetch_repos_with_static_calls(token, concurrency))
+
+async def _fetch_repos_with_static_calls(token, concurrency):
+    async with open_github_client(token, concurrency) as client:
+        return await _rank_repos_with_static_calls(client)
+
+async def _rank_repos_with_static_calls(client):
     print("🔍 Step 1: Fetching popular C# repositories...")
     
     # First, get all popular C# repositories  
     repo_query = "language:C# -is:archived stars:>10000 size:>10000"
-    repo_url = f"https://api.github.com/search/repositories?q={requests.utils.quote(repo_query)}&sort=stars&order=desc&per_page=100"
+    repo_params = {"q": repo_query, "sort": "stars", "order": "desc", "per_page": 100}
     
     print(f"🔍 Repository Search URL:")
-    print(f"   {repo_url}")
+    print(f"   {client.url('/search/repositories', repo_params)}")
     print(f"🔍 Repository Query: '{repo_query}'")
     print()
     
-    response = requests.get(repo_url, headers=headers)
+    response = await client.search_repositories(repo_query, per_page=100)
     
-    if response.status_code != 200:
+    if response.status != 200:
         print(f"❌ Repository API Error: {response.text}")
         return []
     
@@ -39,126 +73,62 @@ def fetch_repos_with_static_calls(token):
     print("🔍 Step 2: Checking static method call usage in ALL repositories...")
     repo_static_counts = {}
     
-    # Define query groups for 3 separate searches to avoid complexity issues
-    query_groups = [
-        ("DateTime.Now OR DateTime.UtcNow", "Time patterns"),
-        ("File.Exists OR Directory.Exists", "Existence checks"), 
-        ("Guid.NewGuid", "GUID generation")
-    ]
+    # One search per registry group marked "search" to avoid complexity issues
+    query_groups = PATTERN_REGISTRY.search_queries()
     
     print(f"📊 Checking all {len(repositories)} repositories for static method usage...")
     print(f"🔍 Query groups: {[group[1] for group in query_groups]}")
-    print(f"🧠 Using adaptive rate limiting: starts at 5.0s, increases by 1s if rate limited (max 6 increases)")
-    print(f"⚡ 3 separate queries per repository to avoid complexity issues")
+    print(f"🧠 Rate limiting follows GitHub's X-RateLimit-Remaining/Reset and Retry-After headers "
+          f"({client.concurrency} concurrent requests, up to {client.max_retries} retries)")
+    print(f"⚡ {len(query_groups)} separate queries per repository to avoid complexity issues")
     print()
     
-    # Adaptive rate limiting variables
-    sleep_time = 5.0  # Start with 5.0 seconds for more conservative approach
-    max_increases = 6  # Maximum number of times we can increase the delay
-    increases_used = 0 # Track how many increases we've used
-    max_retries = 3   # Maximum retries per repository
-    import time
-    
-    i = 1
-    while i <= len(repositories):
-        repo_name = repositories[i-1]
-        print(f"[{i}/{len(repositories)}] Checking {repo_name} (delay: {sleep_time}s)...")
-        
-        # Search for static method patterns using 3 separate queries to avoid complexity issues
+    async def count_static_calls(repo_name):
+        # Search for static method patterns using the query groups defined above
         # Note: path:*.cs filter doesn't work reliably in GitHub API, 
         # so we search all files and filter client-side if needed
+        responses = await asyncio.gather(*(
+            client.search_code(f"{query_pattern} repo:{repo_name}")
+            for query_pattern, _ in query_groups
+        ), return_exceptions=True)
         
-        # Group patterns into 3 logical queries to reduce complexity per query
-        query_groups = [
-            ("DateTime.Now OR DateTime.UtcNow", "Time patterns"),
-            ("File.Exists OR Directory.Exists", "Existence checks"), 
-            ("Guid.NewGuid", "GUID generation")
-        ]
-        
-        total_static_calls = 0
         query_results = {}
+        for (_, query_name), response in zip(query_groups, responses):
+            if isinstance(response, BaseException) or response.status != 200:
+                if not isinstance(response, BaseException) and response.rate_limited:
+                    # Still rate limited after every retry
+                    return repo_name, None
+                # Query too complex (422) or other error, count as 0 for this pattern
+                query_results[query_name] = 0
+            else:
+                query_results[query_name] = response.json().get("total_count", 0)
+        return repo_name, query_results
+    
+    # Repositories are checked concurrently and reported as they finish
+    checks = [count_static_calls(repo_name) for repo_name in repositories]
+    for i, check in enumerate(asyncio.as_completed(checks), 1):
+        repo_name, query_results = await check
+        print(f"[{i}/{len(repositories)}] Checked {repo_name}")
         
-        retry_count = 0
-        success = False
-        
-        while retry_count < max_retries and not success:
-            # Try all 3 queries and sum the results
-            all_queries_success = True
-            current_total = 0
-            current_results = {}
-            
-            for query_pattern, query_name in query_groups:
-                static_query = f"{query_pattern} repo:{repo_name}"
-                static_url = f"https://api.github.com/search/code?q={requests.utils.quote(static_query)}&per_page=1"
-                
-                response = requests.get(static_url, headers=headers)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    count = data.get("total_count", 0)
-                    current_results[query_name] = count
-                    current_total += count
-                    
-                    # Use adaptive sleep time between queries to avoid rate limiting
-                    time.sleep(sleep_time)
-                    
-                elif response.status_code == 403:
-                    # Rate limited - will retry all queries
-                    all_queries_success = False
-                    break
-                elif response.status_code == 422:
-                    # Query too complex, count as 0 for this pattern
-                    current_results[query_name] = 0
-                else:
-                    # Other error, count as 0 for this pattern
-                    current_results[query_name] = 0
+        if query_results is None:
+            print(f"   ❌ Still rate limited after {client.max_retries} retries, skipping {repo_name}")
+            repo_static_counts[repo_name] = 0
+        else:
+            total_static_calls = sum(query_results.values())
+            repo_static_counts[repo_name] = total_static_calls
             
-            if all_queries_success:
-                total_static_calls = current_total
-                query_results = current_results
-                repo_static_counts[repo_name] = total_static_calls
-                
-                if total_static_calls > 0:
-                    print(f"   📊 {total_static_calls} total static method calls found")
-                    breakdown = ", ".join([f"{name}: {count}" for name, count in query_results.items() if count > 0])
-                    if breakdown:
-                        print(f"   📋 Breakdown: {breakdown}")
-                else:
-                    print(f"   📊 {total_static_calls} static method calls found")
-                
-                success = True
-                
-            elif not all_queries_success:
-                retry_count += 1
-                if increases_used < max_increases:
-                    old_sleep_time = sleep_time
-                    sleep_time += 1.0  # Increase delay by 1 second
-                    increases_used += 1
-                    print(f"   ⚠️  Rate limited (attempt {retry_count}/{max_retries})")
-                    print(f"   🕐 Increasing delay from {old_sleep_time}s to {sleep_time}s (increase {increases_used}/{max_increases})")
-                else:
-                    print(f"   ⚠️  Rate limited (attempt {retry_count}/{max_retries}) - already at max delay ({sleep_time}s)")
-                
-                if retry_count < max_retries:
-                    print(f"   🔄 Waiting {sleep_time}s and retrying all queries...")
-                    time.sleep(sleep_time)
-                    # Reset for retry
-                    current_total = 0
-                    current_results = {}
-                else:
-                    print(f"   ❌ Max retries exceeded, skipping {repo_name}")
-                    repo_static_counts[repo_name] = 0
-                    success = True  # Exit retry loop
+            if total_static_calls > 0:
+                print(f"   📊 {total_static_calls} total static method calls found")
+                breakdown = ", ".join([f"{name}: {count}" for name, count in query_results.items() if count > 0])
+                if breakdown:
+                    print(f"   📋 Breakdown: {breakdown}")
+            else:
+                print(f"   📊 {total_static_calls} static method calls found")
         
         print()
-        
-        # Add delay before next request (only if we successfully processed this repo)
-        if success and i < len(repositories):
-            time.sleep(sleep_time)
-        
-        i += 1
     
-    # Sort repositories by total static call usage count (descending)
+    # Sort repositories by total static call usage count (descending), in search order on ties
+    repo_static_counts = {repo: repo_static_counts[repo] for repo in repositories}
     sorted_repos = sorted(repo_static_counts.items(), key=lambda x: x[1], reverse=True)
     
     print("🏆 ALL repositories sorted by core static method call usage:")
@@ -171,8 +141,13 @@ def fetch_repos_with_static_calls(token):
     # Show summary
     total_searched = len(repo_static_counts)
     repos_with_static_calls = len([count for count in repo_static_counts.values() if count > 0])
+    stats = client.stats
     print(f"📊 Summary: Searched {total_searched} repos, {repos_with_static_calls} have core static method calls")
-    print(f"🕐 Final delay time: {sleep_time}s (started at 5.0s, used {increases_used}/{max_increases} increases)")
+    print(f"🕐 {stats['requests']} API requests, {stats['rate_limited']} rate limited, "
+          f"{stats['waits']} waits for rate limit resets")
+    if client.cache is not None:
+        print(f"💾 {stats['cached']} responses from cache, {stats['not_modified']} revalidated unchanged "
+              f"({client.cache.db_path}, TTL {client.cache.ttl_seconds:g}s)")
     print()
     
     # Select top 10 repositories with static calls usage for cloning and analysis
@@ -220,15 +195,17 @@ def fetch_repos_with_static_calls(token):
 
 def fetch_popular_csharp_repos(token, num_repos):
     """Fallback: Fetch popular C# repositories that likely contain DateTime usage."""
-    headers = {"Authorization": f"token {token}"}
+    return asyncio.run(_fetch_popular_csharp_repos(token, num_repos))
+
+async def _fetch_popular_csharp_repos(token, num_repos):
     query = "language:csharp stars:>1000"
-    url = f"https://api.github.com/search/repositories?q={requests.utils.quote(query)}&sort=stars&order=desc&per_page={num_repos}"
     
-    print(f"🔄 Fallback Repository Search URL:")
-    print(f"   {url}")
-    
-    response = requests.get(url, headers=headers)
-    if response.status_code != 200:
+    async with open_github_client(token) as client:
+        print(f"🔄 Fallback Repository Search URL:")
+        print(f"   {client.url('/search/repositories', {'q': query, 'sort': 'stars', 'order': 'desc', 'per_page': num_repos})}")
+        
+        response = await client.search_repositories(query, per_page=num_repos)
+    if response.status != 200:
         print(f"❌ Fallback API Error: {response.text}")
         return []
     
@@ -257,34 +234,32 @@ def clone_repo(repo_name):
     return repo_path
 
 def verify_datetime_usage(repo_path):
-    """Manually verify if the repo contains DateTime.Now or DateTime.UtcNow usage."""
+    """Manually verify if the repo contains usage of the registry's time patterns (DateTime.Now, DateTime.UtcNow)."""
     print(f"🔍 Manually searching for DateTime usage in {repo_path}...")
     
-    # Search for DateTime.Now
     try:
-        result_now = subprocess.run([
-            "grep", "-r", "--include=*.cs", "DateTime\\.Now", repo_path
-        ], capture_output=True, text=True)
-        
-        result_utcnow = subprocess.run([
-            "grep", "-r", "--include=*.cs", "DateTime\\.UtcNow", repo_path
-        ], capture_output=True, text=True)
-        
-        now_count = len(result_now.stdout.splitlines()) if result_now.returncode == 0 else 0
-        utcnow_count = len(result_utcnow.stdout.splitlines()) if result_utcnow.returncode == 0 else 0
+        total_matches = 0
+        examples = None
+        for pattern in PATTERN_REGISTRY.group("Time patterns"):
+            result = subprocess.run([
+                "grep", "-r", "-E", "--include=*.cs", pattern.grep_regex, repo_path
+            ], capture_output=True, text=True)
+            
+            lines = result.stdout.splitlines() if result.returncode == 0 else []
+            total_matches += len(lines)
+            print(f"   Found {len(lines)} {pattern.name} matches")
+            if lines and examples is None:
+                examples = (pattern.name, lines[:3])
         
-        total_matches = now_count + utcnow_count
-        print(f"   Found {now_count} DateTime.Now matches")
-        print(f"   Found {utcnow_count} DateTime.UtcNow matches")
         print(f"   Total: {total_matches} DateTime static calls")
         
         if total_matches > 0:
             print(f"   ✅ This repo DOES contain DateTime static calls!")
             # Show a few examples
-            if result_now.stdout:
-                print(f"   📝 Example DateTime.Now usage:")
-                for line in result_now.stdout.splitlines()[:3]:
-                    print(f"      {line}")
+            name, lines = examples
+            print(f"   📝 Example {name} usage:")
+            for line in lines:
+                print(f"      {line}")
         else:
             print(f"   ❌ This repo does NOT contain DateTime static calls!")
             
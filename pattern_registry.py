@@ -0,0 +1,277 @@
+"""
+Pattern Registry
+
+Single source of the static APIs the orchestrators look for.
+
+The registry is static_patterns.json next to this module. It is read by
+test_orchestrator.py (scanning and test generation), orchestrator.py (GitHub
+code search queries and grep verification) and the StaticCallAnalyzer
+(Roslyn member access matching). Each entry names a type, the properties and
+methods of it to track, a group used to batch GitHub queries, whether the
+group is searched on GitHub, and whether the entry is enabled.
+
+The enabled patterns compile into one PatternMatcher. The type names are
+folded into a trie and emitted as a single regular expression, so the C
+regex engine walks the text once like an Aho-Corasick automaton over the
+type names; the member after each type is then verified with a dictionary
+lookup and a check of the next character (a call for methods, not an
+assignment for properties). Adding members costs nothing at match time and
+adding types only widens the trie, so scan cost stays nearly flat as the
+registry grows.
+
+Usage:
+    registry = load_registry()
+    matcher = registry.compile()
+    for name, offset in matcher.finditer(source):
+        print(name, offset)
+
+    registry.search_queries()
+    # [('DateTime.Now OR DateTime.UtcNow', 'Time patterns'), ...]
+"""
+
+import json
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+REGISTRY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static_patterns.json')
+REGISTRY_VERSION = 1
+
+# Registry entry key listing the members of each kind
+PATTERN_KINDS = {'property': 'properties', 'method': 'methods'}
+
+IDENTIFIER = re.compile(r'[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*')
+
+# What may follow a member: a call or generic call for methods, anything but
+# a plain assignment for properties
+METHOD_CALL = re.compile(r'\s*[(<]')
+PROPERTY_ASSIGNMENT = re.compile(r'\s*=(?![=>])')
+
+
+@dataclass(frozen=True)
+class StaticPattern:
+    """One tracked static member, e.g. DateTime.Now."""
+
+    type_name: str
+    member: str
+    kind: str
+    group: str
+    search: bool = False
+
+    @property
+    def name(self) -> str:
+        return f'{self.type_name}.{self.member}'
+
+    @property
+    def regex(self) -> str:
+        """Standalone Python regular expression matching what the PatternMatcher reports."""
+        access = rf'\b{re.escape(self.type_name)}\s*\.\s*{re.escape(self.member)}\b'
+        if self.kind == 'method':
+            return access + r'(?=\s*[(<])'
+        return access + r'(?!\s*=(?![=>]))'
+
+    @property
+    def grep_regex(self) -> str:
+        """POSIX extended regular expression for `grep -E` (member access only, no verification)."""
+        type_name = self.type_name.replace('.', r'\.')
+        return rf'\b{type_name}[[:space:]]*\.[[:space:]]*{self.member}\b'
+
+
+class PatternMatcher:
+    """Compiled single-pass matcher for a set of StaticPatterns."""
+
+    def __init__(self, patterns: Iterable[StaticPattern]):
+        """
+        Build the type-name trie and the member lookup table.
+
+        Args:
+            patterns: Patterns to match (names must be unique)
+        """
+        self._members: Dict[Tuple[str, str], Tuple[str, str]] = {
+            (p.type_name, p.member): (p.name, p.kind) for p in patterns
+        }
+        type_names = sorted({type_name for type_name, _ in self._members})
+        self.literals = [name.encode('utf-8') for name in type_names]
+
+        trie = trie_regex(type_names)
+        # The trie comes first so the regex engine can skip ahead to candidate
+        # first characters; the identifier boundary is checked afterwards. The
+        # member is only looked ahead at, so in `File.File.Exists(` the second
+        # `File` is still a candidate.
+        self._regex = re.compile(rf'({trie})\s*\.\s*(?=(\w+))')
+        self._prefilter = re.compile(trie.encode('utf-8'))
+
+    def may_match(self, data) -> bool:
+        """
+        Cheap bytes-level check for whether a buffer contains any tracked type name.
+
+        Args:
+            data: bytes, mmap or other buffer
+
+        Returns:
+            False only if no pattern can match
+        """
+        return self._prefilter.search(data) is not None
+
+    def finditer(self, content: str) -> Iterator[Tuple[str, int]]:
+        """
+        Find every tracked member access in source text.
+
+        Args:
+            content: C# source text
+
+        Yields:
+            (pattern name, offset of the type name) in text order
+        """
+        members = self._members
+        for m in self._regex.finditer(content):
+            start = m.start()
+            if start and (content[start - 1].isalnum() or content[start - 1] == '_'):
+                continue
+            entry = members.get(m.group(1, 2))
+            if entry is None:
+                continue
+            name, kind = entry
+            end = m.end(2)
+            if kind == 'method':
+                if not METHOD_CALL.match(content, end):
+                    continue
+            elif PROPERTY_ASSIGNMENT.match(content, end):
+                continue
+            yield name, start
+
+
+class PatternRegistry:
+    """Ordered collection of StaticPatterns loaded from the registry file."""
+
+    def __init__(self, patterns: Iterable[StaticPattern], source: str = ''):
+        """
+        Args:
+            patterns: Patterns in registry order
+
+        Raises:
+            ValueError: If two patterns have the same name
+        """
+        self.source = source
+        self.patterns: List[StaticPattern] = []
+        seen = set()
+        for pattern in patterns:
+            if pattern.name in seen:
+                raise ValueError(f"Duplicate pattern in registry {source or '<memory>'}: {pattern.name}")
+            seen.add(pattern.name)
+            self.patterns.append(pattern)
+        self._matcher: Optional[PatternMatcher] = None
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def __iter__(self) -> Iterator[StaticPattern]:
+        return iter(self.patterns)
+
+    @property
+    def names(self) -> List[str]:
+        return [p.name for p in self.patterns]
+
+    def regexes(self) -> Dict[str, str]:
+        """Return the standalone regular expression of every pattern, keyed by name."""
+        return {p.name: p.regex for p in self.patterns}
+
+    def group(self, group: str) -> 'PatternRegistry':
+        """Return the patterns of one group as a registry."""
+        return PatternRegistry((p for p in self.patterns if p.group == group), self.source)
+
+    def search_queries(self) -> List[Tuple[str, str]]:
+        """
+        Return one GitHub code search query per searched group.
+
+        Returns:
+            (query, group) tuples in registry order, e.g.
+            ('File.Exists OR Directory.Exists', 'Existence checks')
+        """
+        groups: Dict[str, List[str]] = {}
+        for pattern in self.patterns:
+            if pattern.search:
+                groups.setdefault(pattern.group, []).append(pattern.name)
+        return [(' OR '.join(names), group) for group, names in groups.items()]
+
+    def compile(self) -> PatternMatcher:
+        """Return the (cached) single-pass matcher for all patterns."""
+        if self._matcher is None:
+            self._matcher = PatternMatcher(self.patterns)
+        return self._matcher
+
+
+def trie_regex(words: Iterable[str]) -> str:
+    """
+    Fold words into a trie and emit it as a regular expression.
+
+    Shared prefixes are factored out (``File|FileInfo`` becomes
+    ``File(?:Info)?``), so the engine never compares a prefix twice and the
+    alternation at each node is tried only on its distinct next characters.
+    Longer words are preferred at every node.
+
+    Args:
+        words: Literal strings
+
+    Returns:
+        Regular expression matching exactly the given words ('(?!)' if none)
+    """
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def emit(node: dict) -> str:
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            return f'(?:{body})?'
+        return body
+
+    return emit(trie) or '(?!)'
+
+
+def load_registry(path: str = REGISTRY_FILE, include_disabled: bool = False) -> PatternRegistry:
+    """
+    Load the pattern registry.
+
+    Args:
+        path: Registry JSON file
+        include_disabled: Also load entries marked "enabled": false
+
+    Returns:
+        PatternRegistry in file order (properties before methods within an entry)
+
+    Raises:
+        ValueError: If the file is malformed
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    if data.get('version') != REGISTRY_VERSION:
+        raise ValueError(f"Unsupported pattern registry version in {path}: {data.get('version')}")
+
+    patterns = []
+    for entry in data.get('types', []):
+        type_name = entry.get('type', '')
+        if not IDENTIFIER.fullmatch(type_name):
+            raise ValueError(f"Invalid type name in pattern registry {path}: {type_name!r}")
+        if not entry.get('enabled', True) and not include_disabled:
+            continue
+        for kind, key in PATTERN_KINDS.items():
+            for member in entry.get(key, []):
+                if not IDENTIFIER.fullmatch(member) or '.' in member:
+                    raise ValueError(f"Invalid member name in pattern registry {path}: {type_name}.{member}")
+                patterns.append(StaticPattern(
+                    type_name=type_name,
+                    member=member,
+                    kind=kind,
+                    group=entry.get('group', type_name),
+                    search=bool(entry.get('search', False)),
+                ))
+    return PatternRegistry(patterns, path)
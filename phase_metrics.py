@@ -0,0 +1,178 @@
+"""
+Phase Metrics
+
+Per-phase timing and resource instrumentation for orchestrator runs.
+
+Each phase records wall time, CPU time of this process and of its waited-for
+children (dotnet, pwsh, scan workers), the peak RSS of this process and of
+its largest child, and counters such as files and bytes read or tests
+written. Results can be flattened into metrics CSV columns and exported as a
+Chrome trace (open in chrome://tracing or https://ui.perfetto.dev).
+
+Peak RSS comes from getrusage, which only reports the high-water mark since
+process start; a phase's peak is the high-water mark at the end of that
+phase. Resource figures are empty where the resource module is unavailable
+(Windows).
+
+Usage:
+    recorder = PhaseRecorder()
+    with recorder.phase('build'):
+        ...
+        recorder.count('files_read', 1)
+    print(recorder.metrics())
+    recorder.write_chrome_trace('./test_logs/trace.json')
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Counters every phase reports, even when zero (others passed to count() are ignored)
+PHASE_COUNTERS = ('files_read', 'bytes_read', 'tests_written')
+
+# Per-phase CSV columns, each prefixed with the phase name
+PHASE_COLUMNS = (
+    'wall_s',
+    'cpu_s',
+    'child_cpu_s',
+    'peak_rss_mb',
+    'child_peak_rss_mb',
+) + PHASE_COUNTERS
+
+
+@dataclass
+class PhaseStats:
+    """Measurements for one completed phase."""
+
+    name: str
+    start: float
+    wall_s: float = 0.0
+    cpu_s: Optional[float] = None
+    child_cpu_s: Optional[float] = None
+    peak_rss_mb: Optional[float] = None
+    child_peak_rss_mb: Optional[float] = None
+    counters: Dict[str, int] = field(default_factory=dict)
+
+    def values(self) -> Dict[str, object]:
+        """Return the measurements and counters keyed by column name."""
+        values = {
+            'wall_s': round(self.wall_s, 3),
+            'cpu_s': _round(self.cpu_s),
+            'child_cpu_s': _round(self.child_cpu_s),
+            'peak_rss_mb': _round(self.peak_rss_mb),
+            'child_peak_rss_mb': _round(self.child_peak_rss_mb),
+        }
+        for counter in PHASE_COUNTERS:
+            values[counter] = self.counters.get(counter, 0)
+        return values
+
+    def columns(self) -> Dict[str, object]:
+        """Flatten into metrics columns named '{phase}_{column}'."""
+        return {f'{self.name}_{column}': value for column, value in self.values().items()}
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 3)
+
+
+def _usage():
+    """Return (self cpu, children cpu, self peak MB, child peak MB), or Nones without resource."""
+    if resource is None:
+        return None, None, None, None
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return (
+        own.ru_utime + own.ru_stime,
+        children.ru_utime + children.ru_stime,
+        own.ru_maxrss / scale,
+        children.ru_maxrss / scale,
+    )
+
+
+class PhaseRecorder:
+    """Collects PhaseStats for the phases of one run."""
+
+    def __init__(self):
+        self.phases: List[PhaseStats] = []
+        self._origin = time.perf_counter()
+        self._current: Optional[PhaseStats] = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[PhaseStats]:
+        """
+        Measure the enclosed block as one phase.
+
+        Args:
+            name: Phase name, used as the column prefix and trace event name
+        """
+        stats = PhaseStats(name=name, start=time.perf_counter() - self._origin)
+        cpu, child_cpu, _, _ = _usage()
+        previous, self._current = self._current, stats
+        try:
+            yield stats
+        finally:
+            self._current = previous
+            stats.wall_s = time.perf_counter() - self._origin - stats.start
+            end_cpu, end_child_cpu, peak_rss, child_peak_rss = _usage()
+            if cpu is not None:
+                stats.cpu_s = end_cpu - cpu
+                stats.child_cpu_s = end_child_cpu - child_cpu
+                stats.peak_rss_mb = peak_rss
+                stats.child_peak_rss_mb = child_peak_rss
+            self.phases.append(stats)
+
+    def count(self, counter: str, amount: int = 1):
+        """Add to a counter of the phase currently running (ignored outside phases)."""
+        stats = self._current
+        if stats is None:
+            return
+        with self._lock:
+            stats.counters[counter] = stats.counters.get(counter, 0) + amount
+
+    def metrics(self) -> Dict[str, object]:
+        """Return the columns of every recorded phase."""
+        columns: Dict[str, object] = {}
+        for stats in self.phases:
+            columns.update(stats.columns())
+        return columns
+
+    def write_chrome_trace(self, path: str):
+        """
+        Write the phases as complete ('X') events in Chrome trace format.
+
+        Args:
+            path: Output JSON file
+        """
+        pid = os.getpid()
+        events = []
+        for stats in sorted(self.phases, key=lambda s: s.start):
+            args = {column: value for column, value in stats.values().items() if value is not None}
+            events.append({
+                'name': stats.name,
+                'cat': 'phase',
+                'ph': 'X',
+                'ts': round(stats.start * 1e6),
+                'dur': round(stats.wall_s * 1e6),
+                'pid': pid,
+                'tid': 0,
+                'args': args,
+            })
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, indent=1)
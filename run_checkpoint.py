@@ -0,0 +1,122 @@
+"""
+Run Checkpoint
+
+Persists the outputs of each orchestrator step, keyed by a hash of the
+step's inputs, so an interrupted or failed run can be resumed without
+repeating steps whose inputs are unchanged.
+
+Each step's input hash folds in the hash of the step before it, so a change
+early in the pipeline invalidates every later checkpoint.
+
+Usage:
+    store = CheckpointStore('./test_logs/checkpoints.json')
+    key = inputs_hash(scanner.fingerprint, source_state_hash(paths))
+    outputs = store.get('scan_generate', key)
+    if outputs is None:
+        outputs = do_step()
+        store.save('scan_generate', key, outputs)
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Iterable, Optional
+
+# Bump when the meaning of stored step outputs changes
+CHECKPOINT_VERSION = 1
+
+
+def inputs_hash(*parts) -> str:
+    """Hash JSON-serializable parts into a step input key."""
+    digest = hashlib.sha256(str(CHECKPOINT_VERSION).encode())
+    for part in parts:
+        digest.update(json.dumps(part, sort_keys=True, default=str).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def file_hash(path: str) -> Optional[str]:
+    """Return the SHA-256 of a file's content, or None if it does not exist."""
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def source_state_hash(paths: Iterable[str]) -> str:
+    """
+    Hash the path, size and mtime of every file, without reading them.
+
+    Args:
+        paths: Source files the step depends on
+
+    Returns:
+        Hex digest that changes whenever a file is added, removed or modified
+    """
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        digest.update(f'{path}\0{stat.st_size}\0{stat.st_mtime_ns}\n'.encode('utf-8', 'surrogateescape'))
+    return digest.hexdigest()
+
+
+class CheckpointStore:
+    """JSON file of completed steps, their input hashes and outputs."""
+
+    def __init__(self, path: str):
+        """
+        Load checkpoints written by earlier runs.
+
+        Args:
+            path: JSON checkpoint file
+        """
+        self.path = path
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.steps = json.load(f)
+        except (OSError, ValueError):
+            self.steps = {}
+
+    def get(self, step: str, key: str) -> Optional[dict]:
+        """
+        Return a step's stored outputs if they were produced from the same inputs.
+
+        Args:
+            step: Step name
+            key: Current input hash of the step
+
+        Returns:
+            Outputs dictionary, or None if the step must run
+        """
+        entry = self.steps.get(step)
+        if entry is None or entry.get('inputs') != key:
+            return None
+        return entry.get('outputs', {})
+
+    def save(self, step: str, key: str, outputs: dict):
+        """Record a completed step and write the checkpoint file."""
+        self.steps[step] = {
+            'inputs': key,
+            'completed_at': datetime.now().isoformat(),
+            'outputs': outputs,
+        }
+        self._write()
+
+    def invalidate(self, step: str):
+        """Forget a step so it runs on the next resume."""
+        if self.steps.pop(step, None) is not None:
+            self._write()
+
+    def _write(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.steps, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
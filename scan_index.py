@@ -0,0 +1,195 @@
+"""
+Scan Index
+
+Persistent, incremental cache of static call analysis results.
+
+Each C# file's path, mtime, size and content hash are stored in SQLite along
+with its pattern hits and extracted (class, method, params, is_static) tuples.
+On repeat runs a file whose size and mtime are unchanged is served from the
+index instead of being re-read and re-analyzed.
+
+The index is tagged with the scanner fingerprint (pattern set + analyzer
+version); when that changes, every cached entry is discarded.
+
+Usage:
+    with ScanIndex('./test_logs/scan_index.sqlite', scanner.fingerprint) as index:
+        cached = index.lookup(path)
+        if cached is None:
+            index.store(scanner.analyze_file(path))
+"""
+
+import json
+import os
+import sqlite3
+from typing import Dict, Iterable, Optional, Tuple
+
+from static_scanner import FileAnalysis, FileScan
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    counts TEXT NOT NULL,
+    offsets TEXT NOT NULL,
+    methods TEXT NOT NULL,
+    namespace TEXT NOT NULL DEFAULT ''
+);
+"""
+
+
+class ScanIndex:
+    """SQLite-backed index of per-file scan and extraction results."""
+
+    def __init__(self, db_path: str, fingerprint: str):
+        """
+        Open (or create) the index.
+
+        Args:
+            db_path: Path to the SQLite database file
+            fingerprint: Scanner fingerprint the cached results must match
+        """
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript(SCHEMA)
+        self._add_missing_columns()
+        self.invalidated = self._check_fingerprint(fingerprint)
+
+        # Load the stat columns up front so lookups are dictionary hits
+        self._stats: Dict[str, Tuple[int, int]] = {
+            path: (mtime_ns, size)
+            for path, mtime_ns, size in self.conn.execute('SELECT path, mtime_ns, size FROM files')
+        }
+
+    def __enter__(self) -> 'ScanIndex':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _add_missing_columns(self):
+        """Add columns introduced after the database was created (their rows are reset with the fingerprint)."""
+        columns = {row[1] for row in self.conn.execute('PRAGMA table_info(files)')}
+        if 'namespace' not in columns:
+            self.conn.execute("ALTER TABLE files ADD COLUMN namespace TEXT NOT NULL DEFAULT ''")
+
+    def _check_fingerprint(self, fingerprint: str) -> bool:
+        """Discard all entries if they were produced by a different scanner. Returns True if cleared."""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+        if row and row[0] == fingerprint:
+            return False
+
+        with self.conn:
+            self.conn.execute('DELETE FROM files')
+            self.conn.execute('DELETE FROM meta')
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('fingerprint', ?)",
+                (fingerprint,),
+            )
+        return row is not None
+
+    def get_meta(self, key: str) -> Optional[str]:
+        """Return a value stored alongside the index (e.g. the last scanned git commit)."""
+        row = self.conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        """Store a value alongside the index."""
+        self.conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+
+    def __len__(self) -> int:
+        return len(self._stats)
+
+    def lookup(self, path: str) -> Optional[FileAnalysis]:
+        """
+        Return the cached analysis for a file if it is unchanged on disk.
+
+        Args:
+            path: File path as it was stored
+
+        Returns:
+            Cached FileAnalysis, or None if missing or stale
+        """
+        cached_stat = self._stats.get(path)
+        if cached_stat is None:
+            return None
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if (stat.st_mtime_ns, stat.st_size) != cached_stat:
+            return None
+
+        row = self.conn.execute(
+            'SELECT sha256, counts, offsets, methods, namespace FROM files WHERE path = ?', (path,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        sha256, counts, offsets, methods, namespace = row
+        return FileAnalysis(
+            path=path,
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            sha256=sha256,
+            scan=FileScan(path=path, counts=json.loads(counts), offsets=json.loads(offsets)),
+            methods=[tuple(m) for m in json.loads(methods)],
+            namespace=namespace,
+            cached=True,
+        )
+
+    def store(self, analysis: FileAnalysis):
+        """
+        Insert or replace the cached analysis for a file.
+
+        Args:
+            analysis: Fresh analysis of the file
+        """
+        self.conn.execute(
+            'INSERT OR REPLACE INTO files (path, mtime_ns, size, sha256, counts, offsets, methods, namespace) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (
+                analysis.path,
+                analysis.mtime_ns,
+                analysis.size,
+                analysis.sha256,
+                json.dumps(analysis.scan.counts),
+                json.dumps(analysis.scan.offsets),
+                json.dumps(analysis.methods),
+                analysis.namespace,
+            ),
+        )
+        self._stats[analysis.path] = (analysis.mtime_ns, analysis.size)
+
+    def prune(self, keep_paths: Iterable[str], prefix: str = '') -> int:
+        """
+        Remove entries for files under a prefix that no longer exist.
+
+        Args:
+            keep_paths: Paths that are still present
+            prefix: Only entries whose path starts with this prefix are considered
+
+        Returns:
+            Number of entries removed
+        """
+        keep = set(keep_paths)
+        stale = [path for path in self._stats if path.startswith(prefix) and path not in keep]
+        self.conn.executemany('DELETE FROM files WHERE path = ?', ((path,) for path in stale))
+        for path in stale:
+            del self._stats[path]
+        return len(stale)
+
+    def close(self):
+        """Commit pending changes and close the database."""
+        self.conn.commit()
+        self.conn.close()
@@ -0,0 +1,160 @@
+"""
+Shard Scheduler
+
+Duration-balanced parallel execution of .NET test projects.
+
+Test projects are spread across N shards with longest-processing-time-first
+bin packing, using each project's duration from previous runs (stored in a
+JSON file). Shards run concurrently, each executing `dotnet test` for its
+projects one after another. Per-project results are returned in project
+order, so merged output is identical no matter how projects were sharded.
+
+Usage:
+    store = TestDurationStore('./test_logs/test_durations.json')
+    shards = plan_shards(test_projects, store.durations, shard_count=4)
+    results = run_shards(shards, run_project)
+    store.update(results)
+    store.save()
+"""
+
+import heapq
+import json
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Assumed duration for projects that have never been timed, when no history exists
+DEFAULT_TEST_SECONDS = 60.0
+
+# Runs one test project: project -> (exit_code, stdout, stderr)
+ProjectRunner = Callable[[str], Tuple[int, str, str]]
+
+
+@dataclass
+class Shard:
+    """A group of test projects run sequentially by one worker."""
+
+    index: int
+    projects: List[str] = field(default_factory=list)
+    expected_seconds: float = 0.0
+
+
+@dataclass
+class ProjectResult:
+    """Outcome of running one test project."""
+
+    project: str
+    shard: int
+    exit_code: int
+    stdout: str
+    stderr: str
+    seconds: float
+
+
+class TestDurationStore:
+    """Per-project test durations recorded across runs."""
+
+    def __init__(self, path: str):
+        """
+        Load recorded durations.
+
+        Args:
+            path: JSON file mapping project paths to seconds
+        """
+        self.path = path
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.durations: Dict[str, float] = json.load(f)
+        except (OSError, ValueError):
+            self.durations = {}
+
+    def update(self, results: Iterable[ProjectResult]):
+        """Record the latest duration of each project that ran."""
+        for result in results:
+            self.durations[result.project] = round(result.seconds, 3)
+
+    def save(self):
+        """Write durations back to disk."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(self.durations, f, indent=1, sort_keys=True)
+
+
+def plan_shards(
+    projects: Iterable[str],
+    durations: Dict[str, float],
+    shard_count: int,
+    default_seconds: Optional[float] = None,
+) -> List[Shard]:
+    """
+    Assign projects to shards, longest first, always onto the least-loaded shard.
+
+    Args:
+        projects: Test project paths
+        durations: Known durations in seconds by project
+        shard_count: Number of shards to fill
+        default_seconds: Estimate for untimed projects (defaults to the
+            median known duration, or DEFAULT_TEST_SECONDS without history)
+
+    Returns:
+        Non-empty shards ordered by index
+    """
+    projects = sorted(set(projects))
+    if default_seconds is None:
+        known = [durations[p] for p in projects if p in durations]
+        default_seconds = statistics.median(known) if known else DEFAULT_TEST_SECONDS
+
+    shards = [Shard(index=i) for i in range(max(1, shard_count))]
+    heap = [(0.0, shard.index) for shard in shards]
+
+    # Ties broken by path so the assignment is deterministic
+    estimates = sorted(
+        ((durations.get(p, default_seconds), p) for p in projects),
+        key=lambda item: (-item[0], item[1]),
+    )
+    for seconds, project in estimates:
+        load, index = heapq.heappop(heap)
+        shards[index].projects.append(project)
+        shards[index].expected_seconds = load + seconds
+        heapq.heappush(heap, (load + seconds, index))
+
+    return [shard for shard in shards if shard.projects]
+
+
+def run_shards(shards: List[Shard], run_project: ProjectRunner) -> List[ProjectResult]:
+    """
+    Run all shards concurrently, one thread (and subprocess at a time) per shard.
+
+    Args:
+        shards: Shards from plan_shards
+        run_project: Runs one project's tests and returns (exit_code, stdout, stderr)
+
+    Returns:
+        Results for every project, sorted by project path
+    """
+    def run_shard(shard: Shard) -> List[ProjectResult]:
+        results = []
+        for project in shard.projects:
+            start = time.monotonic()
+            exit_code, stdout, stderr = run_project(project)
+            results.append(ProjectResult(
+                project=project,
+                shard=shard.index,
+                exit_code=exit_code,
+                stdout=stdout,
+                stderr=stderr,
+                seconds=time.monotonic() - start,
+            ))
+        return results
+
+    results = []
+    if shards:
+        with ThreadPoolExecutor(max_workers=len(shards), thread_name_prefix='test-shard') as pool:
+            for shard_results in pool.map(run_shard, shards):
+                results.extend(shard_results)
+    return sorted(results, key=lambda result: result.project)
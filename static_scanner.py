@@ -0,0 +1,613 @@
+"""
+Static Call Scanner
+
+Single-pass discovery of static method call patterns in C# source files.
+
+Patterns come from the pattern registry (see pattern_registry.py), whose
+single-pass matcher keeps scan cost nearly flat as patterns are added, or
+from a mapping of names to regular expressions, which are compiled into one
+alternation. Either way every file is scanned exactly once no matter how
+many patterns are registered. Each scan returns per-pattern hit counts and
+character offsets for the file.
+
+Source is first passed through csharp_lexer.mask_code, so hits inside
+comments, XML doc comments and string literals are ignored, and hits are
+attributed to real member declarations rather than calls or control
+statements.
+
+Usage:
+    from pattern_registry import load_registry
+    from static_scanner import StaticCallScanner, iter_source_files
+
+    scanner = StaticCallScanner(load_registry())
+    # or: StaticCallScanner({'DateTime.Now': r'DateTime\\s*\\.\\s*Now'})
+    for path in iter_source_files('./cloned_repos/abp'):
+        scan = scanner.scan_file(path)
+        if scan:
+            print(path, scan.counts)
+"""
+
+import hashlib
+import json
+import math
+import mmap
+import os
+import re
+import subprocess
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from csharp_lexer import mask_code, member_declaration, source_namespace, type_declaration
+from pattern_registry import PatternRegistry
+
+# Directories that never contain first-party C# sources worth scanning
+SKIP_DIRS = ('bin', 'obj', '.git', '.github', 'packages', 'GeneratedTests')
+
+# Bump whenever scanning or extraction logic changes so cached results are discarded
+ANALYZER_VERSION = 6
+
+# Leading identifier of a pattern, used to derive literal prefilter tokens
+LEADING_LITERAL = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+# Tokens that open or close a scope, used by build_scope_map
+SCOPE_TOKENS = re.compile(r"[{};]|=>")
+
+# (class_name, (method_name, parameters, is_static)) in effect at a point in the file
+ScopeState = Tuple[Optional[str], Optional[Tuple[str, str, bool]]]
+
+
+@dataclass
+class FileScan:
+    """Static call pattern hits found in a single file."""
+
+    path: str
+    counts: Dict[str, int] = field(default_factory=dict)
+    offsets: Dict[str, List[int]] = field(default_factory=dict)
+
+    def __bool__(self) -> bool:
+        return bool(self.counts)
+
+    @property
+    def total_hits(self) -> int:
+        """Total number of pattern hits in the file."""
+        return sum(self.counts.values())
+
+
+@dataclass
+class FileAnalysis:
+    """Scan hits and enclosing members for a file, plus the stat/hash it was computed from."""
+
+    path: str
+    size: int
+    mtime_ns: int
+    sha256: str
+    scan: FileScan
+    methods: List[Tuple[str, str, str, bool]] = field(default_factory=list)
+    # Namespace the file declares ('' if none, or if the file has no hits)
+    namespace: str = ''
+    cached: bool = False
+
+
+class StaticCallScanner:
+    """
+    Scanner that matches every configured pattern in one pass over a file.
+
+    A PatternRegistry is matched with its compiled PatternMatcher. A mapping
+    of regular expressions is joined into a single alternation of capturing
+    groups and matches are reported against the pattern whose group matched,
+    so those patterns are expected not to overlap (which holds for
+    `Type.Member` style patterns with distinct type or member names).
+    """
+
+    def __init__(self, patterns: Union[PatternRegistry, Dict[str, str]]):
+        """
+        Compile the combined scanner.
+
+        Args:
+            patterns: Pattern registry, or mapping of pattern names to regular expressions
+        """
+        self._matcher = None
+        self._group_to_pattern: Dict[int, str] = {}
+
+        if isinstance(patterns, PatternRegistry):
+            # The registry regexes describe exactly what the matcher reports,
+            # so they identify the pattern set in the fingerprint
+            self.patterns = patterns.regexes()
+            self._matcher = patterns.compile()
+            self.literals = self._matcher.literals
+            return
+
+        self.patterns = dict(patterns)
+        parts = []
+        group_index = 1
+        for pattern_name, pattern_regex in self.patterns.items():
+            self._group_to_pattern[group_index] = pattern_name
+            parts.append(f'({pattern_regex})')
+            # Skip past any groups the pattern itself defines
+            group_index += 1 + re.compile(pattern_regex).groups
+
+        self._regex = re.compile('|'.join(parts))
+        self.literals = prefilter_literals(self.patterns)
+
+    def may_match(self, data) -> bool:
+        """
+        Cheap bytes-level check for whether a buffer can contain any pattern.
+
+        Args:
+            data: bytes, mmap or other buffer supporting find()
+
+        Returns:
+            False only if no pattern can match; True if the buffer needs a full scan
+        """
+        if self._matcher is not None:
+            return self._matcher.may_match(data)
+        if self.literals is None:
+            return True
+        return any(data.find(literal) != -1 for literal in self.literals)
+
+    @property
+    def fingerprint(self) -> str:
+        """Stable hash of the pattern set and analyzer version, used to key cached results."""
+        payload = json.dumps({'version': ANALYZER_VERSION, 'patterns': self.patterns}, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def scan_text(self, content: str, path: str = '') -> FileScan:
+        """
+        Scan source text for all patterns.
+
+        Args:
+            content: C# source text
+            path: Path reported in the result
+
+        Returns:
+            FileScan with per-pattern counts and match offsets
+        """
+        return self._scan_code(mask_code(content), path)
+
+    def _scan_code(self, code: str, path: str) -> FileScan:
+        """Scan text already passed through mask_code (comments and literals blanked)."""
+        counts: Dict[str, int] = {}
+        offsets: Dict[str, List[int]] = {}
+
+        if self._matcher is not None:
+            hits = self._matcher.finditer(code)
+        else:
+            group_to_pattern = self._group_to_pattern
+            hits = ((group_to_pattern[m.lastindex], m.start()) for m in self._regex.finditer(code))
+
+        for pattern_name, offset in hits:
+            counts[pattern_name] = counts.get(pattern_name, 0) + 1
+            offsets.setdefault(pattern_name, []).append(offset)
+
+        return FileScan(path=path, counts=counts, offsets=offsets)
+
+    def scan_file(self, file_path: str) -> FileScan:
+        """
+        Read a file and scan it for all patterns.
+
+        Args:
+            file_path: Path to the C# file
+
+        Returns:
+            FileScan for the file (empty if nothing matched)
+        """
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        if not self.may_match(data):
+            return FileScan(path=file_path)
+        return self.scan_text(decode_source(data), file_path)
+
+    def extract_methods(
+        self,
+        content: str,
+        file_path: str = '',
+        scan: Optional[FileScan] = None,
+    ) -> List[Tuple[str, str, str, bool]]:
+        """
+        Locate the class and method enclosing every pattern hit in source text.
+
+        Args:
+            content: C# source text
+            file_path: Path used to derive a fallback class name
+            scan: Existing scan of the same text (rescanned when omitted)
+
+        Returns:
+            List of unique tuples (class_name, method_name, parameters, is_static)
+        """
+        return self._extract_code(mask_code(content), file_path, scan)
+
+    def _extract_code(
+        self,
+        code: str,
+        file_path: str,
+        scan: Optional[FileScan] = None,
+    ) -> List[Tuple[str, str, str, bool]]:
+        """Locate enclosing members in text already passed through mask_code."""
+        results = []
+        if scan is None:
+            scan = self._scan_code(code, file_path)
+        if not scan:
+            return results
+
+        scope_offsets, scope_states = build_scope_map(code)
+        fallback_class = os.path.splitext(os.path.basename(file_path))[0]
+        seen = set()
+
+        offsets = sorted(
+            offset
+            for pattern_offsets in scan.offsets.values()
+            for offset in pattern_offsets
+        )
+        for char_index in offsets:
+            class_name, method = scope_states[bisect_right(scope_offsets, char_index) - 1]
+            # Fallback: use file/class name with a placeholder method
+            method_name, parameters, is_static = method or ('UnknownMethod', '', False)
+
+            key = (class_name or fallback_class, method_name, parameters, is_static)
+            if key not in seen:
+                seen.add(key)
+                results.append(key)
+
+        return results
+
+    def extract_file(self, file_path: str) -> List[Tuple[str, str, str, bool]]:
+        """
+        Read a file and locate the members enclosing its pattern hits.
+
+        Args:
+            file_path: Path to the C# file
+
+        Returns:
+            List of unique tuples (class_name, method_name, parameters, is_static)
+        """
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+        return self.extract_methods(content, file_path)
+
+    def analyze_file(self, file_path: str) -> FileAnalysis:
+        """
+        Read a file once, scan it and extract the members enclosing its hits.
+
+        The file is memory-mapped so hashing and the literal prefilter run
+        over the page cache without allocating a copy. Only files that
+        contain a candidate token are decoded, masked (comments and literals
+        blanked) once, and run through the matcher and scope tracking.
+
+        Args:
+            file_path: Path to the C# file
+
+        Returns:
+            FileAnalysis including the file's size, mtime and content hash
+        """
+        with open(file_path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            if stat.st_size == 0:
+                # Empty files cannot be mapped
+                sha256, content = hashlib.sha256().hexdigest(), None
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    sha256 = hashlib.sha256(mm).hexdigest()
+                    content = decode_source(mm[:]) if self.may_match(mm) else None
+
+        code = mask_code(content) if content else None
+        scan = self._scan_code(code, file_path) if code else FileScan(path=file_path)
+        return FileAnalysis(
+            path=file_path,
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            sha256=sha256,
+            scan=scan,
+            methods=self._extract_code(code, file_path, scan) if scan else [],
+            namespace=(source_namespace(code) or '') if scan else '',
+        )
+
+
+def prefilter_literals(patterns: Dict[str, str]) -> Optional[List[bytes]]:
+    """
+    Derive the literal tokens at least one of which every match must contain.
+
+    Each pattern contributes its leading identifier (e.g. ``DateTime`` for
+    ``DateTime\\s*\\.\\s*Now``). If any pattern does not start with a
+    literal identifier the prefilter cannot be used safely.
+
+    Args:
+        patterns: Mapping of pattern names to regular expressions
+
+    Returns:
+        Sorted list of UTF-8 encoded literals, or None if prefiltering is unsafe
+    """
+    literals = set()
+    for pattern_regex in patterns.values():
+        if '|' in pattern_regex:
+            return None
+        m = LEADING_LITERAL.match(pattern_regex)
+        if not m:
+            return None
+        literal = m.group()
+        # A quantifier after the literal makes its last character optional
+        if pattern_regex[m.end():m.end() + 1] in ('?', '*', '{'):
+            literal = literal[:-1]
+        if not literal:
+            return None
+        literals.add(literal.encode('utf-8'))
+    return sorted(literals)
+
+
+def build_scope_map(code: str) -> Tuple[List[int], List[ScopeState]]:
+    """
+    Track class and method scopes in a single forward pass over masked code.
+
+    The code between two scope tokens is the header of the next body.
+    Headers that declare a type or (directly inside a type) a method open
+    that scope at their '{' (or '=>' for expression-bodied members); brace
+    depth decides when it ends. Calls, control statements and lambdas inside
+    a method body never replace the enclosing method.
+
+    Args:
+        code: C# source text passed through mask_code, so braces and
+            declarations inside comments and literals are already gone
+
+    Returns:
+        Tuple of (offsets, states): states[i] is the scope in effect from
+        offsets[i] up to the next offset. Use bisect_right(offsets, pos) - 1
+        to find the scope at any character position.
+    """
+    root: ScopeState = (None, None)
+    offsets = [0]
+    states = [root]
+    stack = [root]
+    # Expression-bodied member in effect until its terminating ';'
+    expression_frame = None
+    expression_depth = 0
+    header_start = 0
+
+    for token in SCOPE_TOKENS.finditer(code):
+        kind = token.group()
+        current = states[-1]
+        header = code[header_start:token.start()]
+        header_start = token.end()
+
+        if kind == '{':
+            frame = current
+            if current[1] is None:
+                class_name = type_declaration(header)
+                if class_name:
+                    frame = (class_name, None)
+                else:
+                    method = member_declaration(header, current[0])
+                    if method:
+                        frame = (current[0], method)
+            stack.append(frame)
+        elif kind == '}':
+            if len(stack) > 1:
+                stack.pop()
+            frame = stack[-1]
+            if expression_frame and len(stack) == expression_depth:
+                frame = expression_frame
+        elif kind == '=>':
+            method = member_declaration(header, current[0]) if current[1] is None else None
+            if not method:
+                continue
+            frame = (current[0], method)
+            expression_frame = frame
+            expression_depth = len(stack)
+        else:
+            if not (expression_frame and len(stack) == expression_depth):
+                continue
+            expression_frame = None
+            frame = stack[-1]
+
+        if frame is not current:
+            offsets.append(token.start())
+            states.append(frame)
+
+    return offsets, states
+
+
+def decode_source(data: bytes) -> str:
+    """Decode raw file bytes the same way text-mode reads do (UTF-8, universal newlines)."""
+    content = data.decode('utf-8', errors='ignore')
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return content
+
+
+def iter_source_files(project_dir: str, extension: Union[str, Tuple[str, ...]] = '.cs') -> Iterator[str]:
+    """
+    Walk a project directory and yield source files, skipping build output.
+
+    Args:
+        project_dir: Root directory to walk
+        extension: File extension, or tuple of file name endings, to include
+
+    Yields:
+        Paths of matching source files
+    """
+    for root, dirs, files in os.walk(project_dir):
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+        for file in files:
+            if file.endswith(extension):
+                yield os.path.join(root, file)
+
+
+def _run_chunk(scanner: StaticCallScanner, task: str, paths: List[str]) -> List[Tuple[str, Any, Optional[str]]]:
+    """Apply one scanner task to every path in a chunk, capturing per-file errors."""
+    func = getattr(scanner, task)
+    results = []
+    for path in paths:
+        try:
+            results.append((path, func(path), None))
+        except Exception as e:
+            results.append((path, None, str(e)))
+    return results
+
+
+def imap_files(
+    scanner: StaticCallScanner,
+    task: str,
+    paths: Iterable[str],
+    workers: int = 1,
+    chunk_size: Optional[int] = None,
+    lookup: Optional[Callable[[str], Any]] = None,
+    max_pending: Optional[int] = None,
+) -> Iterator[Tuple[str, Any, Optional[str]]]:
+    """
+    Lazily run a scanner task ('scan_file', 'extract_file' or 'analyze_file') over many files.
+
+    With more than one worker the paths are split into contiguous chunks and
+    processed in a process pool with at most max_pending chunks in flight,
+    so results can be consumed while later chunks are still being scanned
+    and memory stays bounded. Results are always yielded in input order.
+
+    Args:
+        scanner: Scanner to run (pickled once per chunk)
+        task: Name of the scanner method to call with each path
+        paths: File paths to process
+        workers: Number of worker processes (1 runs in-process)
+        chunk_size: Files per chunk (defaults to ~4 chunks per worker)
+        lookup: Optional callable returning a cached result for a path (or
+            None); it runs in the calling process and cached paths are not
+            sent to the workers
+        max_pending: Maximum chunks in flight (defaults to 2 per worker)
+
+    Yields:
+        (path, result, error) tuples in input order
+    """
+    paths = list(paths)
+    if workers <= 1 or len(paths) < 2:
+        for path in paths:
+            cached = lookup(path) if lookup else None
+            if cached is not None:
+                yield path, cached, None
+            else:
+                yield from _run_chunk(scanner, task, [path])
+        return
+
+    chunk_size = chunk_size or max(1, math.ceil(len(paths) / (workers * 4)))
+    max_pending = max_pending or workers * 2
+    in_flight = deque()
+
+    def drain(chunk, cached, future):
+        computed = iter(future.result() if future else ())
+        for path in chunk:
+            if path in cached:
+                yield path, cached[path], None
+            else:
+                yield next(computed)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for start in range(0, len(paths), chunk_size):
+            chunk = paths[start:start + chunk_size]
+            cached = {}
+            todo = []
+            for path in chunk:
+                result = lookup(path) if lookup else None
+                if result is not None:
+                    cached[path] = result
+                else:
+                    todo.append(path)
+
+            future = pool.submit(_run_chunk, scanner, task, todo) if todo else None
+            in_flight.append((chunk, cached, future))
+            if len(in_flight) >= max_pending:
+                yield from drain(*in_flight.popleft())
+
+        while in_flight:
+            yield from drain(*in_flight.popleft())
+
+
+def map_files(
+    scanner: StaticCallScanner,
+    task: str,
+    paths: Iterable[str],
+    workers: int = 1,
+    chunk_size: Optional[int] = None,
+) -> List[Tuple[str, Any, Optional[str]]]:
+    """
+    Run a scanner task over many files and collect the results.
+
+    See imap_files; this is the eager form.
+
+    Returns:
+        List of (path, result, error) tuples in input order
+    """
+    return list(imap_files(scanner, task, paths, workers, chunk_size))
+
+
+def _git_paths(project_dir: str, *args: str) -> List[str]:
+    """Run a git command in project_dir that prints NUL-separated paths."""
+    result = subprocess.run(
+        ['git', '-C', project_dir, *args],
+        capture_output=True,
+        check=True,
+    )
+    return [p for p in result.stdout.decode('utf-8', errors='surrogateescape').split('\0') if p]
+
+
+def is_git_checkout(project_dir: str) -> bool:
+    """Return True if project_dir is inside a git work tree and git is available."""
+    try:
+        result = subprocess.run(
+            ['git', '-C', project_dir, 'rev-parse', '--is-inside-work-tree'],
+            capture_output=True,
+            text=True,
+        )
+    except OSError:
+        return False
+    return result.returncode == 0 and result.stdout.strip() == 'true'
+
+
+def git_head(project_dir: str) -> str:
+    """Return the commit hash checked out in project_dir."""
+    result = subprocess.run(
+        ['git', '-C', project_dir, 'rev-parse', 'HEAD'],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout.strip()
+
+
+def git_source_files(project_dir: str, extension: str = '.cs', since: Optional[str] = None) -> List[str]:
+    """
+    List source files using git instead of walking the directory tree.
+
+    Tracked and untracked-but-not-ignored files are included, so .gitignore
+    rules are respected. SKIP_DIRS is still applied for untracked build
+    output such as GeneratedTests.
+
+    Args:
+        project_dir: Directory inside a git work tree
+        extension: File extension to include
+        since: If given, only files changed since this revision (committed or
+            not) plus new untracked files are returned
+
+    Returns:
+        Paths joined onto project_dir, in the same form as iter_source_files
+
+    Raises:
+        OSError: If git is not installed
+        subprocess.CalledProcessError: If git fails (e.g. unknown revision)
+    """
+    pathspec = f'*{extension}'
+    untracked = _git_paths(project_dir, 'ls-files', '-z', '--others', '--exclude-standard', '--', pathspec)
+    if since:
+        tracked = _git_paths(
+            project_dir, 'diff', '-z', '--name-only', '--relative', '--diff-filter=d', since, '--', pathspec
+        )
+    else:
+        tracked = _git_paths(project_dir, 'ls-files', '-z', '--cached', '--', pathspec)
+
+    files = []
+    for rel_path in dict.fromkeys(tracked + untracked):
+        parts = rel_path.split('/')
+        if any(part in SKIP_DIRS for part in parts[:-1]):
+            continue
+        path = os.path.join(project_dir, *parts)
+        # Tracked files deleted from the work tree are still listed by ls-files
+        if os.path.isfile(path):
+            files.append(path)
+    return files
@@ -0,0 +1,302 @@
+"""
+Symbol Index
+
+Parsed, cached view of C# source files for TestGenerationTools.
+
+Each file is read and lexed once into a ParsedFile holding its text, a line
+table (the offset at which every line starts) and the line range of every
+method and constructor, indexed by name and signature. ParsedFiles are kept
+in an LRU cache bounded by their approximate size in memory and are
+reparsed when a file's mtime or size changes, so agents that probe many
+members of the same file pay for one read and one parse. Member names,
+signatures and declaration lines are dictionary keys, so looking one up is
+a single dictionary hit. Results are not memoized: callers (agents, through
+tool_server.py) send arbitrary text, which would grow the cache past its
+byte budget.
+
+A lookup resolves a signature to the member it declares (`GetCurrentTime`,
+`GetCurrentTime()`, `Parse(string text, int radix)` or the declaration line
+`public static DateTime GetCurrentTime()`). Any other text, such as the
+static call `DateTime.Now`, resolves to the member containing its first
+occurrence; outside any member a few lines around the match are used.
+
+Usage:
+    index = SymbolIndex(max_bytes=64 * 1024 * 1024)
+    parsed = index.get('DateHelper.cs')
+    lines = parsed.lookup('DateTime.Now')
+    if lines:
+        print(parsed.text(*lines))
+"""
+
+import os
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import accumulate
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from csharp_lexer import mask_code, member_declaration, type_declaration
+from static_scanner import SCOPE_TOKENS, decode_source
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Lines shown around a match that is not inside any member
+CONTEXT_BEFORE = 5
+CONTEXT_AFTER = 10
+
+# Rough per-entry overhead of Python list items and index dictionaries
+ENTRY_BYTES = 64
+
+# First and last line (0-based, inclusive)
+LineRange = Tuple[int, int]
+
+
+@dataclass(frozen=True)
+class MemberSpan:
+    """A method or constructor declaration and the lines its body spans."""
+
+    class_name: Optional[str]
+    name: str
+    parameters: str
+    is_static: bool
+    start_line: int
+    end_line: int
+
+    @property
+    def signature(self) -> str:
+        return f'{self.name}({self.parameters})'
+
+
+class ParsedFile:
+    """One C# file with its line table and member index."""
+
+    def __init__(self, path: str, content: str, mtime_ns: int, size: int):
+        """
+        Parse a file's content.
+
+        Args:
+            path: File path
+            content: Decoded file content
+            mtime_ns: Modification time the content was read at
+            size: File size the content was read at
+        """
+        self.path = path
+        self.content = content
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.line_starts = [0]
+        self.line_starts.extend(accumulate(len(line) + 1 for line in content.split('\n')[:-1]))
+        self.members = parse_members(content, self.line_starts)
+        self._member_starts = [member.start_line for member in self.members]
+
+        self._signatures: Dict[str, MemberSpan] = {}
+        for member in self.members:
+            declaration = content[self.line_starts[member.start_line]:self.line_end(member.start_line)]
+            for key in (member.name, member.signature, ' '.join(declaration.split())):
+                self._signatures.setdefault(key, member)
+
+        self.cost = (
+            len(content)
+            + ENTRY_BYTES * (len(self.line_starts) + len(self.members) + len(self._signatures))
+        )
+
+    def line_end(self, line: int) -> int:
+        """Offset of the end of a line, excluding its newline."""
+        if line + 1 < len(self.line_starts):
+            return self.line_starts[line + 1] - 1
+        return len(self.content)
+
+    def line_of(self, offset: int) -> int:
+        """0-based line containing a character offset."""
+        return bisect_right(self.line_starts, offset) - 1
+
+    def member_at(self, line: int) -> Optional[MemberSpan]:
+        """Innermost member whose lines include a line, if any."""
+        index = bisect_right(self._member_starts, line) - 1
+        while index >= 0:
+            member = self.members[index]
+            if member.end_line >= line:
+                return member
+            index -= 1
+        return None
+
+    def lookup(self, signature: str) -> Optional[LineRange]:
+        """
+        Find the lines that describe a signature.
+
+        Args:
+            signature: Member name, signature or declaration line, or any
+                text such as a static call
+
+        Returns:
+            (start line, end line) of the declared member, of the member
+            containing the first occurrence, or of a window around it; None
+            if the text does not occur in the file
+        """
+        member = self._signatures.get(' '.join(signature.split()))
+        if member is None:
+            offset = self.content.find(signature)
+            if offset == -1:
+                return None
+            line = self.line_of(offset)
+            member = self.member_at(line)
+            if member is None:
+                return (
+                    max(0, line - CONTEXT_BEFORE),
+                    min(len(self.line_starts), line + CONTEXT_AFTER) - 1,
+                )
+
+        return member.start_line, member.end_line
+
+    def lookup_many(self, signatures: Iterable[str]) -> Dict[str, Optional[LineRange]]:
+        """
+        Find the lines of several signatures in this file.
+
+        Args:
+            signatures: Signatures as accepted by lookup
+
+        Returns:
+            lookup's result for every distinct signature, in input order
+        """
+        return {signature: self.lookup(signature) for signature in dict.fromkeys(signatures)}
+
+    def text(self, start_line: int, end_line: int) -> str:
+        """Text of an inclusive range of lines."""
+        return self.content[self.line_starts[start_line]:self.line_end(end_line)]
+
+
+def parse_members(content: str, line_starts: List[int]) -> List[MemberSpan]:
+    """
+    Find every method and constructor declaration and the lines it spans.
+
+    Uses the same header-based recognition as static_scanner.build_scope_map:
+    a member starts at the first code of its header (after any doc comment,
+    including attributes) and ends at the '}' closing its body, or at the ';'
+    ending an expression body.
+
+    Args:
+        content: C# source text
+        line_starts: Offset of the start of every line of content
+
+    Returns:
+        Members in declaration order
+    """
+    code = mask_code(content)
+    members: List[MemberSpan] = []
+    # (class name, member, member start offset or None for inner blocks)
+    stack: List[Tuple[Optional[str], Optional[Tuple[str, str, bool]], Optional[int]]] = [(None, None, None)]
+    expression: Optional[Tuple[Optional[str], Tuple[str, str, bool], int]] = None
+    expression_depth = 0
+    header_start = 0
+
+    def add(class_name, member, start, end):
+        name, parameters, is_static = member
+        members.append(MemberSpan(
+            class_name=class_name,
+            name=name,
+            parameters=parameters,
+            is_static=is_static,
+            start_line=bisect_right(line_starts, start) - 1,
+            end_line=bisect_right(line_starts, end - 1) - 1,
+        ))
+
+    for token in SCOPE_TOKENS.finditer(code):
+        kind = token.group()
+        class_name, member, _ = stack[-1]
+        header = code[header_start:token.start()]
+        start = header_start + len(header) - len(header.lstrip())
+        header_start = token.end()
+
+        if kind == '{':
+            if member is not None:
+                stack.append((class_name, member, None))
+                continue
+            declared_class = type_declaration(header)
+            if declared_class:
+                stack.append((declared_class, None, None))
+                continue
+            declared = member_declaration(header, class_name)
+            stack.append((class_name, declared, start if declared else None))
+        elif kind == '}':
+            if len(stack) > 1:
+                class_name, member, member_start = stack.pop()
+                if member_start is not None:
+                    add(class_name, member, member_start, token.end())
+        elif kind == '=>':
+            if member is None and expression is None:
+                declared = member_declaration(header, class_name)
+                if declared:
+                    expression = (class_name, declared, start)
+                    expression_depth = len(stack)
+        elif expression and len(stack) == expression_depth:
+            add(*expression, token.end())
+            expression = None
+
+    members.sort(key=lambda m: m.start_line)
+    return members
+
+
+class SymbolIndex:
+    """LRU cache of ParsedFiles, bounded by size and invalidated on change."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Args:
+            max_bytes: Approximate memory budget for cached files; the least
+                recently used files are evicted beyond it
+        """
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+        self._files: 'OrderedDict[str, ParsedFile]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def get(self, path: str) -> ParsedFile:
+        """
+        Return the parsed file, reading and parsing it only if it changed.
+
+        Args:
+            path: C# file path
+
+        Returns:
+            ParsedFile for the file's current content
+
+        Raises:
+            OSError: If the file cannot be read
+        """
+        key = os.path.abspath(path)
+        stat = os.stat(key)
+        with self._lock:
+            parsed = self._files.get(key)
+            if parsed and parsed.mtime_ns == stat.st_mtime_ns and parsed.size == stat.st_size:
+                self._files.move_to_end(key)
+                self.stats['hits'] += 1
+                return parsed
+
+        # Parse outside the lock so other files stay available meanwhile
+        with open(key, 'rb') as f:
+            content = decode_source(f.read())
+        parsed = ParsedFile(path, content, stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            self.stats['misses'] += 1
+            previous = self._files.pop(key, None)
+            if previous:
+                self.bytes -= previous.cost
+            self._files[key] = parsed
+            self.bytes += parsed.cost
+            while self.bytes > self.max_bytes and len(self._files) > 1:
+                _, evicted = self._files.popitem(last=False)
+                self.bytes -= evicted.cost
+                self.stats['evictions'] += 1
+        return parsed
+
+    def clear(self):
+        """Drop every cached file."""
+        with self._lock:
+            self._files.clear()
+            self.bytes = 0
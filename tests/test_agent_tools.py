@@ -0,0 +1,37 @@
+"""Batch test generation: files written to an output_dir stay inside it."""
+
+import pytest
+
+import agent_tools
+
+METHODS = [
+    {'class_name': 'DateHelper', 'method_name': 'GetCurrentTime', 'is_static': True},
+    {'class_name': 'FileValidator', 'method_name': 'Validate', 'parameters': 'string path'},
+]
+
+
+def test_output_dir_writes_only_changed_files(tmp_path):
+    tools = agent_tools.TestGenerationTools()
+
+    assert tools.generate_mock_tests(METHODS, output_dir=str(tmp_path)).startswith('Wrote 2 test files')
+    assert tools.generate_mock_tests(METHODS, output_dir=str(tmp_path)).endswith('(2 unchanged)')
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        agent_tools.MOCK_TESTS_MANIFEST, 'DateHelper_GetCurrentTime_Tests.cs', 'FileValidator_Validate_Tests.cs',
+    ]
+    assert (tmp_path / 'DateHelper_GetCurrentTime_Tests.cs').read_text() == tools.generate_mock_test(
+        'DateHelper', 'GetCurrentTime', is_static=True,
+    )
+
+
+@pytest.mark.parametrize('method', [
+    {'class_name': '../Escape', 'method_name': 'Run'},
+    {'class_name': 'Escape', 'method_name': 'Run/../../x'},
+    {'class_name': 'Escape'},
+])
+def test_output_dir_rejects_non_identifier_names(tmp_path, method):
+    output_dir = tmp_path / 'out'
+
+    result = agent_tools.TestGenerationTools().generate_mock_tests(METHODS + [method], output_dir=str(output_dir))
+
+    assert result.startswith('Error:')
+    assert list(tmp_path.iterdir()) == []
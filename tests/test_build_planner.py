@@ -0,0 +1,107 @@
+"""Build planning: a change rebuilds its project and everything that references it, and nothing else."""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from build_planner import BuildPlanner
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Project name -> (directory, referenced projects)
+PROJECTS = {
+    'C': ('src/C', []),
+    'B': ('src/B', ['C']),
+    'A': ('src/A', ['B']),
+    'B.Tests': ('test/B.Tests', ['B']),
+}
+
+# Records the arguments of every call, one JSON list per line
+DOTNET_STUB = '''#!{python}
+import json, os, sys
+with open(os.environ['DOTNET_LOG'], 'a') as f:
+    f.write(json.dumps(sys.argv[1:]) + '\\n')
+'''
+
+# Builds a plan in a fresh process, so DOTNET is read from the environment
+BUILD = '''
+import subprocess, sys
+from build_planner import BuildPlanner
+planner = BuildPlanner(sys.argv[1])
+for command in planner.build_commands(planner.plan(sys.argv[2:])):
+    subprocess.run(command, check=True)
+'''
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """Project tree A -> B -> C, plus B.Tests -> B, with one source file per project."""
+    paths = {}
+    for name, (directory, references) in PROJECTS.items():
+        project_dir = tmp_path / directory
+        project_dir.mkdir(parents=True)
+        items = ''.join(
+            f'    <ProjectReference Include="{os.path.relpath(tmp_path / PROJECTS[ref][0], project_dir)}/{ref}.csproj" />\n'
+            for ref in references
+        )
+        project = project_dir / f'{name}.csproj'
+        project.write_text(f'<Project Sdk="Microsoft.NET.Sdk">\n  <ItemGroup>\n{items}  </ItemGroup>\n</Project>\n')
+        (project_dir / f'{name.replace(".", "")}Class.cs').write_text(f'class {name.replace(".", "")}Class {{ }}\n')
+        paths[name] = str(project)
+    return tmp_path, paths
+
+
+def source(tree, name):
+    root, _ = tree
+    return str(root / PROJECTS[name][0] / f'{name.replace(".", "")}Class.cs')
+
+
+def test_change_in_leaf_rebuilds_dependents(tree):
+    root, projects = tree
+    plan = BuildPlanner(str(root)).plan([source(tree, 'C')])
+
+    assert plan.affected == sorted(projects.values())
+    # Building A and B.Tests builds B and C as references
+    assert plan.targets == sorted([projects['A'], projects['B.Tests']])
+
+
+def test_change_in_top_project_leaves_references_alone(tree):
+    root, projects = tree
+    plan = BuildPlanner(str(root)).plan([source(tree, 'A')])
+
+    assert plan.affected == [projects['A']]
+    assert plan.targets == [projects['A']]
+
+
+def test_change_in_project_file_and_unowned_file(tree):
+    root, projects = tree
+    (root / 'README.md').write_text('')
+    plan = BuildPlanner(str(root)).plan([projects['B'], str(root / 'README.md')])
+
+    assert plan.affected == sorted([projects['A'], projects['B'], projects['B.Tests']])
+    assert plan.unowned == [str(root / 'README.md')]
+
+
+@pytest.mark.skipif(os.name == 'nt', reason="Stand-in is a POSIX script")
+@pytest.mark.parametrize('changed, built', [
+    ('C', ['A', 'B.Tests']),
+    ('B', ['A', 'B.Tests']),
+    ('A', ['A']),
+    ('B.Tests', ['B.Tests']),
+])
+def test_dotnet_stand_in_receives_planned_projects(tree, tmp_path_factory, changed, built):
+    root, projects = tree
+    bin_dir = tmp_path_factory.mktemp('bin')
+    dotnet = bin_dir / 'dotnet'
+    dotnet.write_text(DOTNET_STUB.format(python=sys.executable))
+    dotnet.chmod(0o755)
+    log = bin_dir / 'calls.jsonl'
+
+    env = dict(os.environ, DOTNET=str(dotnet), DOTNET_LOG=str(log), PYTHONPATH=PACKAGE_DIR)
+    subprocess.run([sys.executable, '-c', BUILD, str(root), source(tree, changed)], env=env, check=True)
+
+    calls = [json.loads(line) for line in log.read_text().splitlines()]
+    assert calls == [['build', projects[name], '--nologo'] for name in built]
@@ -0,0 +1,64 @@
+"""Class-layout test generation: generated test class and file names must be valid C#."""
+
+import logging
+import os
+import re
+
+import pytest
+
+import test_orchestrator
+from csharp_lexer import to_identifier
+
+IDENTIFIER = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+
+
+class RecordingWriter:
+    """Stands in for GeneratedTestWriter, keeping what would be written."""
+
+    def __init__(self):
+        self.files = {}
+
+    def write(self, path, content, source_path=None):
+        self.files[path] = content
+
+
+def make_orchestrator():
+    orchestrator = test_orchestrator.TestOrchestrator.__new__(test_orchestrator.TestOrchestrator)
+    orchestrator.logger = logging.getLogger('test_class_layout')
+    orchestrator.max_test_file_kb = test_orchestrator.MAX_TEST_FILE_KB
+    orchestrator.generated_sources = set()
+    return orchestrator
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('Initial.Designer', 'Initial_Designer'),
+    ('My-Helper', 'My_Helper'),
+    ('20240101-Init', '_20240101_Init'),
+    ('DateHelper', 'DateHelper'),
+    ('', '_'),
+])
+def test_to_identifier(text, expected):
+    assert to_identifier(text) == expected
+
+
+@pytest.mark.parametrize('file_name, class_name, expected', [
+    ('Initial.Designer.cs', 'Initial', 'Initial_Initial_Designer_Tests'),
+    ('My-Helper.cs', 'Helper', 'Helper_My_Helper_Tests'),
+    ('20240101-Init.cs', 'Init', 'Init__20240101_Init_Tests'),
+    ('DateHelper.cs', 'DateHelper', 'DateHelper_Tests'),
+])
+def test_class_names_from_dotted_and_hyphenated_stems(tmp_path, file_name, class_name, expected):
+    # The namespace comes from the scan; the source file is never read
+    source = tmp_path / file_name
+    writer = RecordingWriter()
+
+    count = make_orchestrator().generate_class_tests_for_file(
+        str(source), [(class_name, 'Build', '', True)], None, writer, 'Acme.Data',
+    )
+
+    assert count == 1
+    [(path, content)] = writer.files.items()
+    assert os.path.basename(path) == f'Acme.Data.{expected}.cs'
+    declared = re.search(r'public class (\S+)', content).group(1)
+    assert declared == expected
+    assert IDENTIFIER.fullmatch(declared)
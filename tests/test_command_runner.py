@@ -0,0 +1,35 @@
+"""Streaming command output: line handlers parse stdout only."""
+
+import sys
+
+from command_runner import STDERR_PREFIX, MatchCounter, run_streaming
+from test_orchestrator import FAILED_TESTS_PATTERN
+
+SUMMARY = 'Failed!  - Failed:     4, Passed: 10'
+
+# Prints the test summary on stdout and echoes it to stderr, like some runners
+ECHOING_RUNNER = f'''
+import sys
+print({SUMMARY!r})
+print({SUMMARY!r}, file=sys.stderr)
+print('Failed!  - Failed:     1, Passed: 3')
+'''
+
+
+def test_handlers_only_see_stdout(tmp_path):
+    failures = MatchCounter(FAILED_TESTS_PATTERN)
+    lines = []
+    log_path = tmp_path / 'run.log'
+
+    with open(log_path, 'w') as log:
+        exit_code, stdout, stderr = run_streaming(
+            [sys.executable, '-c', ECHOING_RUNNER], cwd=str(tmp_path), log=log,
+            line_handlers=[failures, lines.append],
+        )
+
+    assert exit_code == 0
+    assert failures.total == 5
+    assert lines == [SUMMARY + '\n', 'Failed!  - Failed:     1, Passed: 3\n']
+    assert stderr == SUMMARY + '\n'
+    # The log still receives both streams
+    assert STDERR_PREFIX + SUMMARY + '\n' in log_path.read_text()
@@ -0,0 +1,58 @@
+"""C# lexing: what the scanner treats as code and which headers declare members."""
+
+import pytest
+
+from csharp_lexer import mask_code, member_declaration
+
+
+@pytest.mark.parametrize('source, expected', [
+    # Plain, verbatim and character literals
+    ('var s = "a { b \\" }"; x();', 'var s =             ; x();'),
+    ('var s = @"a { b "" }"; x();', 'var s =              ; x();'),
+    ("char c = '{'; x();", 'char c =    ; x();'),
+    # Raw strings, single and multi-line
+    ('var s = """ { "quoted" } """; x();', 'var s =                     ; x();'),
+    ('var s = """\n  { }\n  """; x();', 'var s =    \n     \n     ; x();'),
+    # Interpolation holes stay code; escaped braces and text do not
+    ('var s = $"{DateTime.Now:t} {{ }}";', 'var s =    DateTime.Now:t        ;'),
+    ('var s = $@"{Path.Combine("a", "}")} "" {{";', 'var s =     Path.Combine(   ,    )        ;'),
+    # Raw interpolated strings are masked whole
+    ('var s = $$"""{{{DateTime.Now}}} { }""";', 'var s =                               ;'),
+    # Comments, including XML doc comments
+    ('x(); // DateTime.Now {\n/* } */ y();', 'x();                  \n        y();'),
+    ('/// <summary>DateTime.Now</summary>\nx();', ' ' * 35 + '\nx();'),
+    # Directives only at the start of a line
+    ('#if DEBUG\nvoid F() {\n#endif\n}', '         \nvoid F() {\n      \n}'),
+    ('var x = a # b;', 'var x = a # b;'),
+])
+def test_mask_code(source, expected):
+    masked = mask_code(source)
+
+    assert masked == expected
+    # Offsets are preserved: same length, same newlines, code untouched
+    assert len(masked) == len(source)
+    for original, kept in zip(source, masked):
+        assert kept in (original, ' ') and (original == '\n') == (kept == '\n')
+
+
+@pytest.mark.parametrize('header, expected', [
+    ('public static int Parse(string text,\n int radix)', ('Parse', 'string text, int radix', True)),
+    ('[Fact] public void Test_A()', ('Test_A', '', False)),
+    ('private static (int, string) Pair<T>(List<T> items)', ('Pair', 'List<T> items', True)),
+    ('public override string ToString()', ('ToString', '', False)),
+    ('public new void Hide()', ('Hide', '', False)),
+    ('public Widget(int size)', ('Widget', 'int size', False)),
+    ('Widget(int size)', ('Widget', 'int size', False)),
+    # Control statements, calls, object creation and initializers
+    ('if (x > 0)', None),
+    ('while (true)', None),
+    ('foreach (var item in items)', None),
+    ('Foo(x)', None),
+    ('new Foo(1)', None),
+    ('return Bar(x)', None),
+    ('await Task.Run(x)', None),
+    ('var f = new Foo(x)', None),
+    ('Gadget(int size)', None),
+])
+def test_member_declaration(header, expected):
+    assert member_declaration(header, 'Widget') == expected
@@ -0,0 +1,38 @@
+"""Generated test writer: only tests it wrote itself are ever removed."""
+
+import os
+
+from generated_test_writer import GeneratedTestWriter
+
+
+def write_run(tmp_path, tests, scanned_sources=None):
+    output_dir = tmp_path / 'GeneratedTests'
+    with GeneratedTestWriter(str(output_dir), str(tmp_path / 'manifest.json')) as writer:
+        for name, source in tests.items():
+            writer.write(str(output_dir / name), f'// {name}\n', source)
+    writer.close(scanned_sources=scanned_sources)
+    return writer
+
+
+def test_first_run_keeps_existing_files(tmp_path):
+    output_dir = tmp_path / 'GeneratedTests'
+    output_dir.mkdir()
+    (output_dir / 'HandWritten_Tests.cs').write_text('// by hand\n')
+    (output_dir / 'Legacy_Method_Tests.cs').write_text('// from an older run\n')
+
+    writer = write_run(tmp_path, {'Clock_Tests.cs': 'Clock.cs'})
+
+    assert writer.stats['removed'] == 0
+    assert sorted(os.listdir(output_dir)) == ['Clock_Tests.cs', 'HandWritten_Tests.cs', 'Legacy_Method_Tests.cs']
+
+
+def test_tracked_tests_of_removed_methods_are_removed(tmp_path):
+    source = tmp_path / 'Clock.cs'
+    source.write_text('class Clock { }\n')
+    write_run(tmp_path, {'Clock_Now_Tests.cs': str(source), 'Clock_Today_Tests.cs': str(source)})
+    (tmp_path / 'GeneratedTests' / 'HandWritten_Tests.cs').write_text('// by hand\n')
+
+    writer = write_run(tmp_path, {'Clock_Now_Tests.cs': str(source)}, scanned_sources=[str(source)])
+
+    assert writer.stats == {'written': 0, 'unchanged': 1, 'removed': 1, 'failed': 0}
+    assert sorted(os.listdir(tmp_path / 'GeneratedTests')) == ['Clock_Now_Tests.cs', 'HandWritten_Tests.cs']
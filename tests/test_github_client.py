@@ -0,0 +1,188 @@
+"""GitHub client against a local stub server that simulates GitHub's rate limits."""
+
+import asyncio
+import json
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import github_client
+from github_client import GitHubClient, RateLimitBucket
+
+
+class StubServer:
+    """
+    Local stand-in for the GitHub API.
+
+    Every request is answered by respond(index, now), which returns
+    (status, headers, body); the arrival time of each request is recorded.
+    """
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.times = []
+        self.statuses = []
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                now = time.time()
+                with stub._lock:
+                    index = len(stub.times)
+                    stub.times.append(now)
+                    status, headers, body = stub.respond(index, now)
+                    stub.statuses.append(status)
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self) -> 'StubServer':
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class PrimaryLimit:
+    """A rate limit window of `limit` requests that resets `window` seconds after it starts."""
+
+    def __init__(self, limit: int, window: int):
+        self.limit = limit
+        self.window = window
+        self.reset = None
+        self.used = 0
+
+    def __call__(self, index, now):
+        if self.reset is None or now >= self.reset:
+            self.reset = int(now) + self.window
+            self.used = 0
+        headers = {'X-RateLimit-Limit': str(self.limit), 'X-RateLimit-Reset': str(self.reset)}
+        if self.used >= self.limit:
+            headers['X-RateLimit-Remaining'] = '0'
+            return 403, headers, {'message': 'API rate limit exceeded'}
+        self.used += 1
+        headers['X-RateLimit-Remaining'] = str(self.limit - self.used)
+        return 200, headers, {'total_count': index}
+
+
+def scripted(*responses):
+    """Answer with the given responses in turn, then 200 OK."""
+    def respond(index, now):
+        if index < len(responses):
+            status, headers = responses[index]
+            return status, headers, {'message': 'You have exceeded a secondary rate limit'}
+        return 200, {}, {'total_count': index}
+    return respond
+
+
+@pytest.fixture(autouse=True)
+def short_waits(monkeypatch):
+    # Reset times are exact in these tests; keep the unexplained-limit pause short
+    monkeypatch.setattr(github_client, 'RESET_MARGIN_SECONDS', 0.0)
+    monkeypatch.setattr(github_client, 'SECONDARY_LIMIT_SECONDS', 0.5)
+
+
+def search(stub, count=1, **options):
+    async def run():
+        async with GitHubClient(base_url=stub.url, concurrency=1, **options) as client:
+            responses = [await client.search_code(f'repo:o/r{i}') for i in range(count)]
+        return client, responses
+    return asyncio.run(run())
+
+
+def test_pauses_until_reset_instead_of_exceeding_limit():
+    limit = PrimaryLimit(limit=2, window=2)
+    with StubServer(limit) as stub:
+        client, responses = search(stub, count=4)
+
+    assert [response.status for response in responses] == [200] * 4
+    # The third request waited for the window to reset rather than being refused
+    assert stub.statuses == [200] * 4
+    assert stub.times[2] >= int(stub.times[0]) + 2
+    assert client.stats['waits'] >= 1 and client.stats['rate_limited'] == 0
+
+
+def test_exhausted_limit_retried_after_reset():
+    reset = int(time.time()) + 2
+    with StubServer(scripted(
+        (403, {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': str(reset)}),
+    )) as stub:
+        client, [response] = search(stub)
+
+    assert response.status == 200 and not response.rate_limited
+    assert stub.statuses == [403, 200]
+    assert stub.times[1] >= reset
+
+
+def test_secondary_limit_honours_retry_after():
+    with StubServer(scripted((403, {'Retry-After': '1'}))) as stub:
+        client, [response] = search(stub)
+
+    assert response.status == 200 and not response.rate_limited
+    assert stub.statuses == [403, 200]
+    assert stub.times[1] - stub.times[0] >= 1
+    assert client.stats['rate_limited'] == 1
+
+
+def test_429_without_retry_after_waits_secondary_limit():
+    with StubServer(scripted((429, {'X-RateLimit-Remaining': '10'}))) as stub:
+        client, [response] = search(stub)
+
+    assert response.status == 200 and not response.rate_limited
+    assert stub.statuses == [429, 200]
+    assert stub.times[1] - stub.times[0] >= github_client.SECONDARY_LIMIT_SECONDS
+
+
+def test_gives_up_after_max_retries(monkeypatch):
+    monkeypatch.setattr(github_client, 'SECONDARY_LIMIT_SECONDS', 0.05)
+    with StubServer(scripted(*[(429, {})] * 10)) as stub:
+        client, [response] = search(stub, max_retries=2)
+
+    assert response.status == 429 and response.rate_limited
+    assert stub.statuses == [429] * 3
+
+
+def test_permission_error_returned_without_retry():
+    with StubServer(lambda index, now: (403, {'X-RateLimit-Remaining': '10'}, {'message': 'Forbidden'})) as stub:
+        client, [response] = search(stub)
+
+    assert response.status == 403 and not response.rate_limited
+    assert stub.statuses == [403]
+
+
+def test_bucket_waits_for_reset_on_the_local_clock():
+    now = [1000.0]
+    bucket = RateLimitBucket(clock=lambda: now[0])
+    # The server's clock is 30s ahead of ours; its window resets in 10s
+    bucket.update({
+        'X-RateLimit-Limit': '2', 'X-RateLimit-Remaining': '1', 'X-RateLimit-Reset': '1040',
+        'Date': formatdate(1030, usegmt=True),
+    })
+
+    assert bucket.take() == 0
+    assert bucket.take() == pytest.approx(10 + github_client.RESET_MARGIN_SECONDS)
+    now[0] = 1010.0
+    assert bucket.take() == 0 and bucket.remaining == 1
+
+    bucket.block(5)
+    assert bucket.take() == pytest.approx(5)
@@ -0,0 +1,44 @@
+"""Run metrics: changed-only runs must not be recorded as whole-tree counts."""
+
+import logging
+
+import pytest
+
+import test_orchestrator
+from metrics_store import MetricsStore
+from phase_metrics import PhaseRecorder
+
+PATTERNS = {'DateTime.Now': 2, 'Guid.NewGuid': 1}
+
+
+def record(db_path, scan_scope):
+    orchestrator = test_orchestrator.TestOrchestrator.__new__(test_orchestrator.TestOrchestrator)
+    orchestrator.logger = logging.getLogger('test_run_metrics')
+    orchestrator.phases = PhaseRecorder()
+    orchestrator.metrics = {
+        'scan_scope': scan_scope,
+        'files_with_static_calls': 3,
+        'unit_tests_generated': 5,
+        'static_patterns_found': dict(PATTERNS),
+        'final_coverage': 'N/A',
+    }
+    orchestrator.save_metrics_to_store()
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = str(tmp_path / 'metrics.sqlite')
+    monkeypatch.setattr(test_orchestrator, 'METRICS_DB', path)
+    return path
+
+
+def test_changed_runs_stay_out_of_whole_tree_trends(db_path):
+    record(db_path, 'full')
+    record(db_path, 'changed')
+
+    with MetricsStore(db_path) as store:
+        assert [run_id for run_id, _, _ in store.metric_trend('files_with_static_calls')] == [1]
+        assert [run_id for run_id, _, _ in store.pattern_trend('DateTime.Now')] == [1]
+        assert [(run_id, value) for run_id, _, value in store.metric_trend('changed_unit_tests_generated')] == [(2, 5)]
+        assert [value for _, _, value in store.metric_trend('scan_scope')] == ['full', 'changed']
+        assert store.metric_trend('final_coverage') == []
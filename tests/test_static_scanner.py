@@ -0,0 +1,67 @@
+"""Scope tracking: which class and member encloses each position of a file."""
+
+from bisect import bisect_right
+
+import pytest
+
+from csharp_lexer import mask_code
+from static_scanner import build_scope_map
+
+
+SOURCE = '''namespace Acme
+{
+    public class Clock
+    {
+        private static readonly string Format = "{0:t}";
+        public Foo Make => new Foo(1) { X = 2 };
+        public static DateTime Now() => DateTime.Now;
+        public string Label { get { return $"{DateTime.Now:t}"; } }
+        public void Tick(int n)
+        {
+            if (n > 0) { Save(n); }
+            var f = new Foo(n) { X = 1 };
+            Action a = () => { DateTime.UtcNow.ToString(); };
+        }
+#if DEBUG
+        public void Debug() {
+#else
+        public void Release() {
+#endif
+            var s = @"}";
+        }
+    }
+}
+'''
+
+
+@pytest.mark.parametrize('needle, expected', [
+    ('"{0:t}"', ('Clock', None)),
+    # Object initializer of an expression-bodied property is not a method
+    ('X = 2', ('Clock', None)),
+    # Expression-bodied method
+    ('DateTime.Now;', ('Clock', ('Now', '', True))),
+    ('DateTime.Now:t', ('Clock', None)),
+    # Control statements, initializers and lambdas stay in the enclosing method
+    ('Save(n)', ('Clock', ('Tick', 'int n', False))),
+    ('X = 1', ('Clock', ('Tick', 'int n', False))),
+    ('DateTime.UtcNow', ('Clock', ('Tick', 'int n', False))),
+    # Both #if branches are code, so the member opened first encloses the rest;
+    # a brace in a literal closes nothing
+    ('@"}"', ('Clock', ('Debug', '', False))),
+])
+def test_build_scope_map(needle, expected):
+    offsets, states = build_scope_map(mask_code(SOURCE))
+
+    assert states[bisect_right(offsets, SOURCE.index(needle)) - 1] == expected
+
+
+def test_build_scope_map_closes_scopes():
+    source = SOURCE + 'class Other { void Run() { } }\n'
+    offsets, states = build_scope_map(mask_code(source))
+
+    def scope(needle):
+        return states[bisect_right(offsets, source.index(needle)) - 1]
+
+    assert scope('namespace Acme') == (None, None)
+    assert scope('class Other') == (None, None)
+    assert scope('{ }') == ('Other', ('Run', '', False))
@@ -0,0 +1,76 @@
+"""Symbol index: lookups resolve to member lines and the cache stays within its byte budget."""
+
+import pytest
+
+from symbol_index import SymbolIndex
+
+SOURCE = '''namespace Acme
+{
+    public class DateHelper
+    {
+        public static DateTime GetCurrentTime()
+        {
+            return DateTime.Now;
+        }
+
+        public static int Parse(string text, int radix) => int.Parse(text);
+    }
+}
+'''
+
+
+@pytest.fixture
+def parsed(tmp_path):
+    path = tmp_path / 'DateHelper.cs'
+    path.write_text(SOURCE)
+    return SymbolIndex().get(str(path))
+
+
+@pytest.mark.parametrize('signature, expected', [
+    ('GetCurrentTime', (4, 7)),
+    ('GetCurrentTime()', (4, 7)),
+    ('public  static DateTime GetCurrentTime()', (4, 7)),
+    ('Parse(string text, int radix)', (9, 9)),
+    # Any other text resolves to the member containing it
+    ('DateTime.Now', (4, 7)),
+    # Outside any member, a window around the match
+    ('namespace Acme', (0, 9)),
+    ('Guid.NewGuid', None),
+])
+def test_lookup(parsed, signature, expected):
+    assert parsed.lookup(signature) == expected
+
+
+def container_sizes(parsed):
+    return {name: len(value) for name, value in vars(parsed).items() if isinstance(value, (dict, list))}
+
+
+def test_lookups_do_not_grow_cached_files(parsed):
+    sizes = container_sizes(parsed)
+    cost = parsed.cost
+
+    for i in range(1000):
+        parsed.lookup(f'Unknown{i}()')
+
+    assert parsed.lookup_many(['GetCurrentTime', 'DateTime.Now', 'GetCurrentTime']) == {
+        'GetCurrentTime': (4, 7),
+        'DateTime.Now': (4, 7),
+    }
+    assert container_sizes(parsed) == sizes and parsed.cost == cost
+
+
+def test_cache_evicts_beyond_byte_budget(tmp_path):
+    paths = []
+    for i in range(3):
+        path = tmp_path / f'File{i}.cs'
+        path.write_text(SOURCE)
+        paths.append(str(path))
+    index = SymbolIndex(max_bytes=1)
+
+    for path in paths:
+        index.get(path)
+
+    # The most recent file is always kept, even over budget
+    assert len(index) == 1 and index.stats['evictions'] == 2
+    assert index.get(paths[-1]) is index.get(paths[-1])
+    assert index.stats['hits'] == 2
@@ -0,0 +1,164 @@
+"""Tool server: JSON-RPC sessions, and clients can only write under the configured output root."""
+
+import asyncio
+import json
+import os
+import stat
+import threading
+
+import pytest
+
+import agent_tools
+import tool_server
+
+METHODS = [{'class_name': 'DateHelper', 'method_name': 'GetCurrentTime', 'is_static': True}]
+
+
+def call(server, params):
+    request = {'jsonrpc': '2.0', 'id': 1, 'method': 'generate_mock_tests', 'params': params}
+    return asyncio.run(server.handle_request(request))
+
+
+def test_output_dir_not_served_without_root(tmp_path):
+    server = tool_server.ToolServer(workers=1)
+
+    [tool] = [tool for tool in server.describe_tools() if tool['name'] == 'generate_mock_tests']
+    assert [parameter['name'] for parameter in tool['parameters']] == ['methods']
+    for params in ({'methods': METHODS, 'output_dir': str(tmp_path)}, [METHODS, str(tmp_path)]):
+        assert call(server, params)['error']['code'] == tool_server.INVALID_PARAMS
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize('output_dir', ['../outside', '/tmp', 'link/outside'])
+def test_output_dir_outside_root_rejected(tmp_path, output_dir):
+    root = tmp_path / 'root'
+    root.mkdir()
+    (root / 'link').symlink_to(tmp_path)
+    server = tool_server.ToolServer(workers=1, output_root=str(root))
+
+    response = call(server, {'methods': METHODS, 'output_dir': output_dir})
+
+    assert response['error']['code'] == tool_server.INVALID_PARAMS
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['root']
+
+
+def test_output_dir_inside_root_written(tmp_path):
+    server = tool_server.ToolServer(workers=1, output_root=str(tmp_path))
+
+    response = call(server, {'methods': METHODS, 'output_dir': 'tests'})
+
+    assert response['result'].startswith('Wrote 1 test files')
+    assert (tmp_path / 'tests' / 'DateHelper_GetCurrentTime_Tests.cs').exists()
+
+
+@pytest.mark.skipif(os.name == 'nt', reason="Unix domain sockets")
+def test_socket_owner_only(tmp_path):
+    path = str(tmp_path / 'tools.sock')
+    modes = []
+
+    async def run():
+        server = tool_server.ToolServer(workers=1)
+        task = asyncio.create_task(server.serve_unix(path))
+        while not os.path.exists(path):
+            await asyncio.sleep(0.01)
+        modes.append(stat.S_IMODE(os.stat(path).st_mode))
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(run())
+    assert modes == [0o600]
+
+
+class GatedTools(agent_tools.TestGenerationTools):
+    """Tools whose 'Slow' mock test only finishes once released."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def generate_mock_test(self, class_name, method_name, return_type='dynamic', parameters='', is_static=False):
+        if class_name == 'Slow':
+            assert self.release.wait(5)
+        return super().generate_mock_test(class_name, method_name, return_type, parameters, is_static)
+
+
+def serve(messages, tools=None, workers=4, on_write=None):
+    """Run one session over in-memory lines and return the decoded responses in arrival order."""
+    lines = [(m if isinstance(m, str) else json.dumps(m)).encode() + b'\n' for m in messages]
+    written = []
+
+    async def readline():
+        return lines.pop(0) if lines else b''
+
+    async def write(data):
+        written.append(data)
+        if on_write is not None:
+            on_write()
+
+    server = tool_server.ToolServer(tools, workers=workers)
+    try:
+        asyncio.run(server.serve_session(readline, write))
+    finally:
+        server.close()
+    assert all(data.endswith(b'\n') and data.count(b'\n') == 1 for data in written)
+    return [json.loads(data) for data in written]
+
+
+def request(request_id, method, params=None):
+    message = {'jsonrpc': '2.0', 'method': method, 'params': params}
+    if request_id is not None:
+        message['id'] = request_id
+    return message
+
+
+def test_responses_arrive_out_of_order_and_match_ids():
+    tools = GatedTools()
+    # The slow request is only answered after the fast one behind it was
+    responses = serve([
+        request(1, 'generate_mock_test', {'class_name': 'Slow', 'method_name': 'Run'}),
+        request(2, 'generate_mock_test', {'class_name': 'Fast', 'method_name': 'Run'}),
+    ], tools=tools, on_write=tools.release.set)
+
+    assert [response['id'] for response in responses] == [2, 1]
+    assert 'class Fast_Run_Tests' in responses[0]['result']
+    assert 'class Slow_Run_Tests' in responses[1]['result']
+
+
+def test_batches_and_notifications():
+    responses = serve([
+        [
+            request(1, 'get_moq_setup_template', ['IClock']),
+            request(None, 'get_moq_setup_template', ['INotified']),
+            request(2, 'generate_mock_test', {'class_name': 'Clock', 'method_name': 'Now'}),
+        ],
+        request(None, 'get_moq_setup_template', ['IAlsoNotified']),
+        request(None, 'no_such_tool'),
+    ])
+
+    [batch] = responses
+    assert sorted(response['id'] for response in batch) == [1, 2]
+    assert all('result' in response for response in batch)
+
+
+@pytest.mark.parametrize('message, code', [
+    ('{"jsonrpc": "2.0", "id": 1, ', tool_server.PARSE_ERROR),
+    ({'id': 1, 'method': 'get_moq_setup_template'}, tool_server.INVALID_REQUEST),
+    ([], tool_server.INVALID_REQUEST),
+    (request(1, 'no_such_tool'), tool_server.METHOD_NOT_FOUND),
+    (request(1, 'generate_mock_test', {'class_name': 'Clock'}), tool_server.INVALID_PARAMS),
+    (request(1, 'generate_mock_test', {'class_name': 'Clock', 'method_name': 'Now', 'extra': 1}), tool_server.INVALID_PARAMS),
+    (request(1, 'get_moq_setup_template', 'IClock'), tool_server.INVALID_PARAMS),
+])
+def test_error_codes(message, code):
+    [response] = serve([message])
+
+    assert response['error']['code'] == code
+    assert 'result' not in response
+    expected_id = None if code == tool_server.PARSE_ERROR or message == [] else 1
+    assert response['id'] == expected_id
+
+
+def test_tools_list_describes_every_tool():
+    [response] = serve([request(1, tool_server.LIST_TOOLS)])
+
+    assert [tool['name'] for tool in response['result']] == list(tool_server.TOOL_NAMES)
@@ -0,0 +1,418 @@
+"""
+Tool Server
+
+Serves TestGenerationTools to many concurrent agent sessions on one host.
+
+The server speaks JSON-RPC 2.0 with one message per line, over stdin/stdout
+(one session, for agents that spawn the server as a subprocess) or a Unix
+domain socket (any number of sessions). The method names are the tool
+names and the params are the tool's arguments by name (or by position);
+`tools/list` describes every tool. Batches (JSON arrays) and notifications
+(requests without an id) are supported.
+
+Requests run concurrently, including several from the same session, so
+responses can arrive out of order and must be matched by id. Tools run on a
+thread pool, so file reads never block the event loop. One TestGenerationTools
+instance and its symbol index are shared by every session, so a file parsed
+for one agent is a cache hit for all the others.
+
+Tools that write files only do so under --output-root: without it their
+output directory parameter is not served at all, and with it the directory
+is taken relative to the root and rejected if it resolves outside it. The
+socket is created accessible to the current user only.
+
+Usage:
+    python tool_server.py                            # serve stdin/stdout
+    python tool_server.py --socket /tmp/agent-tools.sock --workers 16
+    python tool_server.py --output-root ./GeneratedTests   # allow generate_mock_tests(output_dir=...)
+
+    # One request per line:
+    {"jsonrpc": "2.0", "id": 1, "method": "analyze_static_method",
+     "params": {"file_path": "DateHelper.cs", "method_signature": "DateTime.Now"}}
+    # {"jsonrpc": "2.0", "id": 1, "result": "Found method 'DateTime.Now' in ..."}
+"""
+
+import argparse
+import asyncio
+import inspect
+import io
+import json
+import logging
+import os
+import signal
+import socket
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from agent_tools import TestGenerationTools
+
+JSONRPC_VERSION = '2.0'
+
+# Tools served, in the order tools/list reports them
+TOOL_NAMES = (
+    'analyze_static_method',
+    'analyze_static_methods',
+    'generate_mock_test',
+    'generate_mock_tests',
+    'generate_test_class',
+    'get_moq_setup_template',
+)
+LIST_TOOLS = 'tools/list'
+
+# Parameters naming a directory a tool writes to; served only with an output root
+OUTPUT_PARAMETERS = {
+    'generate_mock_tests': 'output_dir',
+}
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+# Longest accepted message line
+MAX_MESSAGE_BYTES = 16 * 1024 * 1024
+
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+logger = logging.getLogger(__name__)
+
+
+class RpcError(Exception):
+    """A JSON-RPC error to return to the caller."""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class ToolServer:
+    """Concurrent JSON-RPC front end for one shared TestGenerationTools."""
+
+    def __init__(
+        self,
+        tools: Optional[TestGenerationTools] = None,
+        workers: int = DEFAULT_WORKERS,
+        output_root: Optional[str] = None,
+    ):
+        """
+        Args:
+            tools: Tools to serve (defaults to a new TestGenerationTools
+                using the process-wide symbol index)
+            workers: Threads that run tool calls
+            output_root: Directory that tools may write under (None serves
+                the tools without their output directory parameters)
+        """
+        self.tools = tools or TestGenerationTools()
+        self.output_root = os.path.realpath(output_root) if output_root else None
+        self.stats = {'sessions': 0, 'requests': 0, 'errors': 0}
+        self._methods: Dict[str, Callable[..., Any]] = {name: getattr(self.tools, name) for name in TOOL_NAMES}
+        self._signatures = {name: self._served_signature(name, method) for name, method in self._methods.items()}
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='tool')
+
+    def _served_signature(self, name: str, method: Callable[..., Any]) -> inspect.Signature:
+        """The tool's signature, without its output parameter unless there is an output root."""
+        signature = inspect.signature(method)
+        if name in OUTPUT_PARAMETERS and self.output_root is None:
+            signature = signature.replace(parameters=[
+                parameter for parameter in signature.parameters.values()
+                if parameter.name != OUTPUT_PARAMETERS[name]
+            ])
+        return signature
+
+    def output_path(self, path: str) -> str:
+        """
+        Resolve a client's output directory against the output root.
+
+        Raises:
+            RpcError: If the directory resolves (symlinks included) outside the root
+        """
+        resolved = os.path.realpath(os.path.join(self.output_root, path))
+        if os.path.commonpath([resolved, self.output_root]) != self.output_root:
+            raise RpcError(INVALID_PARAMS, f"Output directory is outside the output root: {path}")
+        return resolved
+
+    def describe_tools(self) -> List[Dict[str, Any]]:
+        """Return the name, description and parameters of every tool, for tools/list."""
+        tools = []
+        for name, method in self._methods.items():
+            parameters = []
+            for parameter in self._signatures[name].parameters.values():
+                description = ''
+                for metadata in getattr(parameter.annotation, '__metadata__', ()):
+                    description = getattr(metadata, 'description', None) or description
+                parameters.append({
+                    'name': parameter.name,
+                    'description': description,
+                    'required': parameter.default is inspect.Parameter.empty,
+                })
+            tools.append({
+                'name': name,
+                'description': inspect.cleandoc(method.__doc__ or '').split('\n\n')[0],
+                'parameters': parameters,
+            })
+        return tools
+
+    async def handle_message(self, message: Any) -> Optional[Any]:
+        """
+        Answer one decoded JSON-RPC message.
+
+        Args:
+            message: A request object or a batch (list) of them
+
+        Returns:
+            The response (a list for batches), or None if nothing is to be
+            sent back (notifications only)
+        """
+        if isinstance(message, list):
+            if not message:
+                return error_response(None, INVALID_REQUEST, "Empty batch")
+            responses = await asyncio.gather(*(self.handle_request(request) for request in message))
+            return [response for response in responses if response is not None] or None
+        return await self.handle_request(message)
+
+    async def handle_request(self, request: Any) -> Optional[Dict[str, Any]]:
+        """Run one JSON-RPC request and build its response (None for notifications)."""
+        request_id = request.get('id') if isinstance(request, dict) else None
+        # Notifications never get a response, not even an error
+        notification = isinstance(request, dict) and 'id' not in request
+        try:
+            if (
+                not isinstance(request, dict)
+                or request.get('jsonrpc') != JSONRPC_VERSION
+                or not isinstance(request.get('method'), str)
+            ):
+                raise RpcError(INVALID_REQUEST, "Invalid JSON-RPC 2.0 request")
+            self.stats['requests'] += 1
+            result = await self.call(request['method'], request.get('params'))
+        except RpcError as e:
+            self.stats['errors'] += 1
+            return None if notification else error_response(request_id, e.code, e.message)
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.exception(f"❌ Tool call failed: {request.get('method')}")
+            return None if notification else error_response(request_id, INTERNAL_ERROR, f"{type(e).__name__}: {e}")
+
+        if notification:
+            return None
+        return {'jsonrpc': JSONRPC_VERSION, 'id': request_id, 'result': result}
+
+    async def call(self, method: str, params: Any) -> Any:
+        """
+        Call a tool on the thread pool.
+
+        Raises:
+            RpcError: If the method is unknown or the params do not fit it
+        """
+        if method == LIST_TOOLS:
+            return self.describe_tools()
+        tool = self._methods.get(method)
+        if tool is None:
+            raise RpcError(METHOD_NOT_FOUND, f"Unknown tool: {method}")
+
+        if params is None:
+            args, kwargs = (), {}
+        elif isinstance(params, dict):
+            args, kwargs = (), params
+        elif isinstance(params, list):
+            args, kwargs = tuple(params), {}
+        else:
+            raise RpcError(INVALID_PARAMS, "params must be an object or an array")
+        try:
+            bound = self._signatures[method].bind(*args, **kwargs)
+        except TypeError as e:
+            raise RpcError(INVALID_PARAMS, str(e))
+        output_parameter = OUTPUT_PARAMETERS.get(method)
+        if bound.arguments.get(output_parameter):
+            if not isinstance(bound.arguments[output_parameter], str):
+                raise RpcError(INVALID_PARAMS, f"{output_parameter} must be a string")
+            bound.arguments[output_parameter] = self.output_path(bound.arguments[output_parameter])
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: tool(*bound.args, **bound.kwargs))
+
+    async def serve_session(
+        self,
+        readline: Callable[[], Awaitable[bytes]],
+        write: Callable[[bytes], Awaitable[None]],
+    ):
+        """
+        Serve one session until its input ends.
+
+        Each line is handled in its own task, so a slow tool call never holds
+        up the requests behind it. Responses are written whole, one per line.
+
+        Args:
+            readline: Returns the next message line (b'' at end of input)
+            write: Sends one encoded response line
+        """
+        self.stats['sessions'] += 1
+        write_lock = asyncio.Lock()
+        pending = set()
+
+        async def respond(line: bytes):
+            try:
+                message = json.loads(line)
+            except ValueError as e:
+                response = error_response(None, PARSE_ERROR, f"Parse error: {e}")
+            else:
+                response = await self.handle_message(message)
+            if response is None:
+                return
+            data = json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n'
+            async with write_lock:
+                await write(data)
+
+        try:
+            while True:
+                try:
+                    line = await readline()
+                except ValueError:
+                    # Line longer than MAX_MESSAGE_BYTES; the stream cannot be resynchronized
+                    async with write_lock:
+                        await write(json.dumps(error_response(None, PARSE_ERROR, "Message too long")).encode() + b'\n')
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                task = asyncio.create_task(respond(line))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+        finally:
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def serve_stdio(self):
+        """Serve one session on stdin/stdout (stdout carries only protocol messages)."""
+        loop = asyncio.get_running_loop()
+        # A private reader on the stdin descriptor: the daemon thread blocked in
+        # it must not hold the lock of sys.stdin, which is closed at exit
+        stdin = io.BufferedReader(io.FileIO(sys.stdin.fileno(), 'rb', closefd=False))
+        stdout = sys.stdout.buffer
+        lines: asyncio.Queue = asyncio.Queue()
+
+        def pump():
+            # Daemon thread, so a read blocked on stdin never delays shutdown
+            while True:
+                line = stdin.readline(MAX_MESSAGE_BYTES + 1)
+                try:
+                    loop.call_soon_threadsafe(lines.put_nowait, line)
+                except RuntimeError:
+                    return  # Event loop closed
+                if not line:
+                    return
+
+        async def readline() -> bytes:
+            line = await lines.get()
+            if len(line) > MAX_MESSAGE_BYTES:
+                raise ValueError("Message too long")
+            return line
+
+        async def write(data: bytes):
+            stdout.write(data)
+            stdout.flush()
+
+        threading.Thread(target=pump, name='stdin', daemon=True).start()
+        logger.info("✅ Serving agent tools on stdin/stdout")
+        await self.serve_session(readline, write)
+
+    async def serve_unix(self, path: str):
+        """
+        Serve sessions on a Unix domain socket until cancelled.
+
+        Args:
+            path: Socket path; a stale socket file is replaced, and the new one
+                is only accessible to the current user
+        """
+        async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+            async def write(data: bytes):
+                writer.write(data)
+                await writer.drain()
+
+            try:
+                await self.serve_session(reader.readline, write)
+            except ConnectionError:
+                pass
+            finally:
+                writer.close()
+
+        if os.path.exists(path):
+            os.remove(path)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Bind with an owner-only umask, so the socket is never reachable by others
+        umask = os.umask(0o177)
+        try:
+            sock.bind(path)
+        except BaseException:
+            sock.close()
+            raise
+        finally:
+            os.umask(umask)
+        server = await asyncio.start_unix_server(handle, sock=sock, limit=MAX_MESSAGE_BYTES)
+        logger.info(f"✅ Serving agent tools on {path}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def close(self):
+        """Stop the tool threads."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def error_response(request_id: Any, code: int, message: str) -> Dict[str, Any]:
+    """Build a JSON-RPC error response."""
+    return {'jsonrpc': JSONRPC_VERSION, 'id': request_id, 'error': {'code': code, 'message': message}}
+
+
+async def serve(socket_path: Optional[str], workers: int, output_root: Optional[str] = None):
+    """Run the server until its input ends (stdio) or it is interrupted (socket)."""
+    server = ToolServer(workers=workers, output_root=output_root)
+    task = asyncio.current_task()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, task.cancel)
+        except (NotImplementedError, RuntimeError):
+            # Windows event loops have no signal handlers; Ctrl+C still interrupts
+            pass
+    try:
+        if socket_path:
+            await server.serve_unix(socket_path)
+        else:
+            await server.serve_stdio()
+    except asyncio.CancelledError:
+        pass
+    finally:
+        server.close()
+        logger.info(
+            f"Tool server stopped: {server.stats['sessions']} sessions, "
+            f"{server.stats['requests']} requests, {server.stats['errors']} errors"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Serve TestGenerationTools over JSON-RPC to concurrent agent sessions")
+    parser.add_argument('--socket', metavar='PATH', help="Listen on a Unix domain socket instead of stdin/stdout (not on Windows)")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help="Threads that run tool calls (default: %(default)s)")
+    parser.add_argument('--output-root', metavar='DIR',
+                        help="Directory tools may write generated tests under (default: tools do not write files)")
+    args = parser.parse_args(argv)
+
+    # stdout is the protocol channel in stdio mode, so logs go to stderr
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', stream=sys.stderr)
+    asyncio.run(serve(args.socket, args.workers, args.output_root))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())